@@ -26,13 +26,18 @@ fetch_ai() {
         jq -r '.hits[] | select(.points > 20) | {id: .objectID, title: .title, url: .url, points: .points, comments: .num_comments, created: .created_at}'
 }
 
+# A failed fetch still lets `jq -s` print "[]" before pipefail trips, so pick one
+# value per list instead of appending a fallback to partial output.
+SHOW_JSON="$(fetch_show 2>/dev/null | jq -s '.' 2>/dev/null)" || SHOW_JSON='[]'
+AI_JSON="$(fetch_ai 2>/dev/null | jq -s '.' 2>/dev/null)" || AI_JSON='[]'
+
 # Create output
 cat > "$OUTPUT_FILE" << EOF
 {
   "timestamp": "$(date -Iseconds)",
   "source": "hackernews",
-  "show_hn": $(fetch_show 2>/dev/null | jq -s '.' || echo '[]'),
-  "ai_posts": $(fetch_ai 2>/dev/null | jq -s '.' || echo '[]')
+  "show_hn": ${SHOW_JSON:-[]},
+  "ai_posts": ${AI_JSON:-[]}
 }
 EOF
 
@@ -0,0 +1,930 @@
+#!/usr/bin/env python3
+"""Shared scoring library for the research signal tools.
+
+Keyword matching, candidate adapters, near-duplicate clustering, the novelty history
+store, the keyword-scan cache and per-candidate evaluation. research_signal_gate.py
+(the CLI), research_signal_matrix.py, research_signal_semantic.py and
+research_signal_replay.py all import it from here. The gate usually runs as
+__main__, so if the helpers imported the gate itself they would load a second copy
+of every class.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import itertools
+import json
+import os
+import re
+import sqlite3
+import struct
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+
+def load_json(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_json(path: Path, payload: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=True)
+        f.write("\n")
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text.lower()).strip()
+
+
+WORD_BOUNDARY_RE = re.compile(r"\b")
+PREFIX_TAIL_RE = re.compile(r"[a-z0-9\-]*\b")
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over every keyword group of a policy.
+
+    One pass over the text finds every group's hits: multi-word phrases match as
+    substrings of the normalized text, single words must start on a word boundary and
+    may continue as a longer word (``\\b{word}[a-z0-9-]*\\b``).
+    """
+
+    def __init__(self, groups: dict[str, list[str]]) -> None:
+        self.groups = list(groups)
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.out: list[list[int]] = [[]]
+        # Per distinct normalized phrase: (length, single word?, [(group, original phrase)]).
+        self.phrases: list[tuple[int, bool, list[tuple[str, str]]]] = []
+        ids: dict[str, int] = {}
+        for group, words in groups.items():
+            for phrase in words:
+                p = normalize(phrase)
+                if not p:
+                    continue
+                if p not in ids:
+                    ids[p] = len(self.phrases)
+                    self.phrases.append((len(p), " " not in p, []))
+                    self._insert(p, ids[p])
+                self.phrases[ids[p]][2].append((group, phrase))
+        self._link()
+
+    def _insert(self, phrase: str, phrase_id: int) -> None:
+        node = 0
+        for ch in phrase:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            node = nxt
+        self.out[node].append(phrase_id)
+
+    def _link(self) -> None:
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def scan(self, text: str) -> dict[str, list[str]]:
+        hay = normalize(text)
+        boundaries: set[int] | None = None
+        matched: set[int] = set()
+        node = 0
+        for end, ch in enumerate(hay, start=1):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for phrase_id in self.out[node]:
+                if phrase_id in matched:
+                    continue
+                length, single_word, _ = self.phrases[phrase_id]
+                if single_word:
+                    if boundaries is None:
+                        boundaries = {m.start() for m in WORD_BOUNDARY_RE.finditer(hay)}
+                    if end - length not in boundaries or not PREFIX_TAIL_RE.match(hay, end):
+                        continue
+                matched.add(phrase_id)
+        hits: dict[str, set[str]] = {group: set() for group in self.groups}
+        for phrase_id in matched:
+            for group, phrase in self.phrases[phrase_id][2]:
+                hits[group].add(phrase)
+        return {group: sorted(found) for group, found in hits.items()}
+
+
+def keyword_groups(policy: dict[str, Any]) -> dict[str, list[str]]:
+    kw = policy.get("keywords", {})
+    groups = {f"focus:{area}": words for area, words in kw.get("focus", {}).items()}
+    groups["implementationEvidence"] = kw.get("implementationEvidence", [])
+    groups["actionability48h"] = kw.get("actionability48h", [])
+    for bucket in ("revenue", "delivery", "moat", "risk"):
+        groups[f"entrepreneur:{bucket}"] = kw.get("entrepreneurImportance", {}).get(bucket, [])
+    return groups
+
+
+@functools.lru_cache(maxsize=8)
+def _matcher_for(groups_json: str) -> KeywordMatcher:
+    return KeywordMatcher(json.loads(groups_json))
+
+
+def compile_policy(policy: dict[str, Any]) -> KeywordMatcher:
+    return _matcher_for(json.dumps(keyword_groups(policy), sort_keys=True))
+
+
+def clamp_0_5(value: float) -> int:
+    if value < 0:
+        return 0
+    if value > 5:
+        return 5
+    return int(round(value))
+
+
+def score_component(hit_count: int, bias: int = 0) -> int:
+    if hit_count <= 0:
+        return 0
+    return min(5, hit_count + bias)
+
+
+SEMANTIC_MIN_SIMILARITY = 0.35
+SEMANTIC_FULL_SIMILARITY = 0.7
+
+
+def semantic_points(candidate: dict[str, Any], policy: dict[str, Any]) -> int:
+    """Relevance from the --semantic annotation: 2 at minSimilarity, 5 at fullSimilarity."""
+    match = candidate.get("semantic")
+    if not match:
+        return 0
+    cfg = policy.get("semantic", {})
+    low = float(cfg.get("minSimilarity", SEMANTIC_MIN_SIMILARITY))
+    high = float(cfg.get("fullSimilarity", SEMANTIC_FULL_SIMILARITY))
+    similarity = float(match.get("similarity", 0))
+    if similarity < low:
+        return 0
+    return clamp_0_5(2 + 3 * min(1.0, (similarity - low) / max(high - low, 1e-9)))
+
+
+def video_candidate(item: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "sourceType": "video",
+        "id": item.get("id", ""),
+        "title": item.get("title", ""),
+        "url": item.get("url", ""),
+        "query": item.get("query", ""),
+        "uploader": item.get("uploader", ""),
+        "rawScore": item.get("score", 0),
+        "meta": {
+            "view_count": item.get("view_count", 0),
+            "upload_date": item.get("upload_date", ""),
+        },
+    }
+
+
+def news_candidate(item: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "sourceType": "news",
+        "id": item.get("hn_url", item.get("url", "")),
+        "title": item.get("title", ""),
+        "url": item.get("url", "") or item.get("hn_url", ""),
+        "query": item.get("query", ""),
+        "uploader": "hn",
+        "rawScore": item.get("score", 0),
+        "meta": {
+            "points": item.get("points", 0),
+            "comments": item.get("comments", 0),
+            "created_at": item.get("created_at", ""),
+        },
+    }
+
+
+# Radar queue adapters. Each monitor writes one JSON object per run with a "source"
+# field; an adapter turns that payload into candidates lazily. Files without a
+# known "source" are matched by file-name prefix instead.
+SourceAdapter = Callable[[dict[str, Any]], Iterator[dict[str, Any]]]
+SOURCE_ADAPTERS: dict[str, SourceAdapter] = {}
+SOURCE_FILE_PREFIXES: dict[str, str] = {}
+WEB_PRIORITY_SCORE = {"high": 3, "medium": 2, "low": 1}
+
+
+def source_adapter(source: str, *file_prefixes: str) -> Callable[[SourceAdapter], SourceAdapter]:
+    def register(adapter: SourceAdapter) -> SourceAdapter:
+        SOURCE_ADAPTERS[source] = adapter
+        for prefix in file_prefixes:
+            SOURCE_FILE_PREFIXES[prefix] = source
+        return adapter
+
+    return register
+
+
+@source_adapter("github-trending", "github-signals-")
+def github_candidates(payload: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    for item in payload.get("repos") or []:
+        name = str(item.get("name") or "")
+        description = str(item.get("description") or "")
+        topics = [str(t) for t in item.get("topics") or []]
+        yield {
+            "sourceType": "repo",
+            "id": name or item.get("url", ""),
+            "title": f"{name}: {description}" if description else name,
+            "url": item.get("url", ""),
+            "query": " ".join(topics),
+            "uploader": name.split("/", 1)[0],
+            "rawScore": item.get("stars", 0) or 0,
+            "meta": {"stars": item.get("stars", 0), "topics": topics, "created_at": item.get("created_at", "")},
+        }
+
+
+@source_adapter("youtube", "youtube-signals-")
+def radar_video_candidates(payload: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    for item in payload.get("new_videos") or []:
+        yield video_candidate({**item, "uploader": item.get("channel", ""), "upload_date": item.get("date", "")})
+
+
+@source_adapter("web-scrapling", "web-signals-")
+def web_candidates(payload: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    for item in payload.get("signals") or []:
+        focus = str(item.get("focus") or "").replace("-", " ")
+        yield {
+            "sourceType": "web",
+            "id": f"{item.get('url', '')}#{str(item.get('content_hash') or '')[:12]}",
+            "title": item.get("title") or item.get("name", ""),
+            "url": item.get("url", ""),
+            "query": f"{focus} {item.get('excerpt', '')}".strip(),
+            "uploader": item.get("name", ""),
+            "rawScore": WEB_PRIORITY_SCORE.get(str(item.get("priority") or "").lower(), 0),
+            "meta": {"change_type": item.get("change_type", ""), "timestamp": item.get("timestamp", "")},
+        }
+
+
+@source_adapter("hackernews", "hn-signals-")
+def radar_hn_candidates(payload: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    for item in [*(payload.get("show_hn") or []), *(payload.get("ai_posts") or [])]:
+        yield news_candidate(
+            {
+                **item,
+                "hn_url": f"https://news.ycombinator.com/item?id={item.get('id', '')}",
+                "score": item.get("points", 0),
+                "created_at": item.get("created", ""),
+            }
+        )
+
+
+def expand_source_globs(patterns: Iterable[str]) -> list[Path]:
+    paths: list[Path] = []
+    for raw in patterns:
+        path = Path(raw).expanduser()
+        matches = sorted(path.parent.glob(path.name)) if any(c in path.name for c in "*?[") else [path]
+        paths.extend(m for m in matches if m not in paths)
+    return paths
+
+
+def adapter_for(path: Path, payload: Any) -> SourceAdapter | None:
+    if isinstance(payload, dict) and payload.get("source") in SOURCE_ADAPTERS:
+        return SOURCE_ADAPTERS[payload["source"]]
+    for prefix, source in SOURCE_FILE_PREFIXES.items():
+        if path.name.startswith(prefix):
+            return SOURCE_ADAPTERS[source]
+    return None
+
+
+def iter_source_candidates(
+    patterns: Iterable[str], errors: list[dict[str, str]] | None = None
+) -> Iterator[dict[str, Any]]:
+    """Candidates from radar queue files, one file in memory at a time.
+
+    Unreadable files and files no adapter claims are skipped and noted in errors.
+    """
+    for path in expand_source_globs(patterns):
+        try:
+            payload = load_json(path)
+        except (OSError, json.JSONDecodeError) as exc:
+            if errors is not None:
+                errors.append({"path": str(path), "error": str(exc)})
+            continue
+        adapter = adapter_for(path, payload)
+        if adapter is None or not isinstance(payload, dict):
+            if errors is not None:
+                errors.append({"path": str(path), "error": "no adapter for this source"})
+            continue
+        yield from adapter(payload)
+
+
+def candidate_key(candidate: dict[str, Any]) -> str:
+    return normalize(f"{candidate.get('title', '')}|{candidate.get('url', '')}")
+
+
+# Near-duplicate detection: MinHash over crudely stemmed title words (minus stopwords),
+# banded into an LSH index so lookups only touch colliding buckets.
+NEAR_DUP_THRESHOLD = 0.6
+NOVELTY_SIMILARITY_FLOOR = 0.3
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+TITLE_STOPWORDS = frozenset(
+    "a an and are at by for from full how i in is it just my new of on or the this to vs what why with you your".split()
+)
+_MINHASH_MASKS = tuple(
+    int.from_bytes(hashlib.blake2b(f"minhash-{i}".encode(), digest_size=8).digest(), "big")
+    for i in range(MINHASH_PERMUTATIONS)
+)
+
+
+def title_shingles(title: str) -> set[str]:
+    shingles = set()
+    for token in re.findall(r"[a-z0-9]+", normalize(title)):
+        if token in TITLE_STOPWORDS:
+            continue
+        for suffix in ("ing", "ed", "es", "s"):
+            if len(token) > len(suffix) + 3 and token.endswith(suffix):
+                token = token[: -len(suffix)]
+                break
+        shingles.add(token)
+    return shingles
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def title_signature(title: str) -> tuple[int, ...] | None:
+    # Cached: clustering and novelty both sign every surviving title.
+    shingles = title_shingles(title)
+    if not shingles:
+        return None
+    hashes = [int.from_bytes(hashlib.blake2b(sh.encode(), digest_size=8).digest(), "big") for sh in shingles]
+    return tuple(min(h ^ mask for h in hashes) for mask in _MINHASH_MASKS)
+
+
+def signature_similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+class LshIndex:
+    def __init__(self) -> None:
+        self.signatures: dict[str, tuple[int, ...]] = {}
+        self.buckets: dict[tuple[int, tuple[int, ...]], list[str]] = {}
+        self.rows = MINHASH_PERMUTATIONS // LSH_BANDS
+
+    def add(self, key: str, signature: tuple[int, ...]) -> None:
+        if key in self.signatures:
+            return
+        self.signatures[key] = signature
+        for band in range(LSH_BANDS):
+            chunk = signature[band * self.rows : (band + 1) * self.rows]
+            self.buckets.setdefault((band, chunk), []).append(key)
+
+    def best_match(self, signature: tuple[int, ...] | None, floor: float) -> tuple[str, float] | None:
+        """Most similar indexed key at or above floor; ties go to the earliest added."""
+        if signature is None:
+            return None
+        candidates: dict[str, None] = {}
+        for band in range(LSH_BANDS):
+            for key in self.buckets.get((band, signature[band * self.rows : (band + 1) * self.rows]), ()):
+                candidates[key] = None
+        best: tuple[str, float] | None = None
+        for key in candidates:
+            similarity = signature_similarity(signature, self.signatures[key])
+            if similarity >= floor and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+
+class NearDupClusterer:
+    """Greedy in-order clustering: a title joins the most similar earlier cluster head."""
+
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self.index = LshIndex()
+        self.count = 0
+
+    def assign(self, title: str) -> int:
+        signature = title_signature(title) if self.threshold > 0 else None
+        match = self.index.best_match(signature, self.threshold)
+        if match is not None:
+            return int(match[0])
+        cluster = self.count
+        self.count += 1
+        if signature is not None:
+            self.index.add(str(cluster), signature)
+        return cluster
+
+
+def near_dup_threshold(policy: dict[str, Any]) -> float:
+    return float(policy.get("novelty", {}).get("nearDuplicateThreshold", NEAR_DUP_THRESHOLD))
+
+
+def collapse_cluster(members: list[dict[str, Any]]) -> dict[str, Any]:
+    best = members[0]
+    for c in members[1:]:
+        if float(c.get("rawScore", 0)) > float(best.get("rawScore", 0)):
+            best = c
+    if len(members) == 1:
+        return best
+    return {
+        **best,
+        "nearDuplicateCount": len(members) - 1,
+        "nearDuplicates": [c.get("url", "") for c in members if c is not best][:5],
+    }
+
+
+def build_candidates(
+    videos: Iterable[dict[str, Any]],
+    hn_items: Iterable[dict[str, Any]],
+    near_threshold: float = NEAR_DUP_THRESHOLD,
+    extra: Iterable[dict[str, Any]] = (),
+) -> list[dict[str, Any]]:
+    """Merge every input into one deduped candidate list; extra holds adapter-built candidates."""
+    candidates = itertools.chain(
+        (video_candidate(item) for item in videos), (news_candidate(item) for item in hn_items), extra
+    )
+
+    dedup: dict[str, dict[str, Any]] = {}
+    for c in candidates:
+        key = candidate_key(c)
+        if not key:
+            continue
+        if key not in dedup:
+            dedup[key] = c
+            continue
+        if float(c.get("rawScore", 0)) > float(dedup[key].get("rawScore", 0)):
+            dedup[key] = c
+    if near_threshold <= 0:
+        return list(dedup.values())
+
+    # Reposts of one story (HN + several channels) collapse into the best-scored member.
+    clusterer = NearDupClusterer(near_threshold)
+    clusters: dict[int, list[dict[str, Any]]] = {}
+    for c in dedup.values():
+        clusters.setdefault(clusterer.assign(str(c.get("title", ""))), []).append(c)
+    return [collapse_cluster(members) for members in clusters.values()]
+
+
+def novelty_score(fingerprint: str, seen_fingerprints: set[str]) -> int:
+    if fingerprint in seen_fingerprints:
+        return 1
+    return 5
+
+
+def graded_novelty(similarity: float) -> int:
+    # 5 below the similarity floor, falling linearly to 1 for an identical title.
+    span = 1.0 - NOVELTY_SIMILARITY_FLOOR
+    return clamp_0_5(max(1.0, 5 - 4 * (similarity - NOVELTY_SIMILARITY_FLOOR) / span))
+
+
+# Accepted history lives in <history>.bin: 12-byte records of (first 8 bytes of the
+# fingerprint, accepted-at epoch seconds), appended once per accepted row. A legacy text
+# history (one hex fingerprint per line) is imported on first use and left untouched.
+HISTORY_RECORD = struct.Struct("<QI")
+DECAY_AFTER_DAYS = 14
+FORGET_AFTER_DAYS = 90
+
+
+def fingerprint_key(fingerprint: str) -> int:
+    return int(fingerprint[:16], 16)
+
+
+def aged_novelty(novelty: int, age_days: float, decay_days: float, forget_days: float) -> int:
+    """Seen items stay at their novelty for decay_days, then recover linearly to 5 by forget_days."""
+    if age_days <= decay_days or forget_days <= decay_days:
+        return novelty
+    if age_days >= forget_days:
+        return 5
+    recovered = (age_days - decay_days) / (forget_days - decay_days)
+    return clamp_0_5(novelty + (5 - novelty) * recovered)
+
+
+class NoveltyIndex:
+    """Accepted history: fingerprint keys with timestamps plus an LSH index over titles."""
+
+    def __init__(
+        self,
+        seen: dict[int, int],
+        near: LshIndex | None = None,
+        near_at: dict[str, int] | None = None,
+        decay_days: float = DECAY_AFTER_DAYS,
+        forget_days: float = FORGET_AFTER_DAYS,
+    ) -> None:
+        self.seen = seen
+        self.near = near or LshIndex()
+        self.near_at = near_at or {}
+        self.decay_days = decay_days
+        self.forget_days = forget_days
+        self.now = int(time.time())
+
+    def __contains__(self, fingerprint: object) -> bool:
+        return isinstance(fingerprint, str) and fingerprint_key(fingerprint) in self.seen
+
+    def age_days(self, accepted_at: int) -> float:
+        return max(0.0, (self.now - accepted_at) / 86400)
+
+    def novelty(self, candidate: dict[str, Any], fingerprint: str) -> tuple[int, dict[str, Any] | None]:
+        accepted_at = self.seen.get(fingerprint_key(fingerprint))
+        if accepted_at is not None:
+            return aged_novelty(1, self.age_days(accepted_at), self.decay_days, self.forget_days), None
+        match = self.near.best_match(title_signature(str(candidate.get("title", ""))), NOVELTY_SIMILARITY_FLOOR)
+        if match is None:
+            return 5, None
+        age = self.age_days(self.near_at.get(match[0], self.now))
+        return aged_novelty(graded_novelty(match[1]), age, self.decay_days, self.forget_days), {
+            "fingerprint": match[0],
+            "similarity": round(match[1], 3),
+            "ageDays": round(age, 1),
+        }
+
+
+def candidate_novelty(
+    candidate: dict[str, Any], fingerprint: str, seen: set[str] | NoveltyIndex
+) -> tuple[int, dict[str, Any] | None]:
+    if isinstance(seen, NoveltyIndex):
+        return seen.novelty(candidate, fingerprint)
+    return novelty_score(fingerprint, seen), None
+
+
+def lsh_path_for(history_path: Path) -> Path:
+    return history_path.with_name(history_path.name + ".lsh.jsonl")
+
+
+def store_path_for(history_path: Path) -> Path:
+    return history_path.with_name(history_path.name + ".bin")
+
+
+def read_history_store(history_path: Path, read_only: bool = False) -> bytes:
+    store = store_path_for(history_path)
+    if store.exists():
+        return store.read_bytes()
+    legacy = parse_history(history_path)
+    stamp = int(history_path.stat().st_mtime) if history_path.exists() else int(time.time())
+    data = b"".join(HISTORY_RECORD.pack(fingerprint_key(fp), stamp) for fp in sorted(legacy) if len(fp) >= 16)
+    if data and not read_only:
+        store.parent.mkdir(parents=True, exist_ok=True)
+        store.write_bytes(data)
+    return data
+
+
+def load_novelty_index(
+    history_path: Path, novelty_cfg: dict[str, Any] | None = None, read_only: bool = False
+) -> NoveltyIndex:
+    cfg = novelty_cfg or {}
+    decay_days = float(cfg.get("decayAfterDays", DECAY_AFTER_DAYS))
+    forget_days = float(cfg.get("forgetAfterDays", FORGET_AFTER_DAYS))
+    cutoff = int(time.time() - forget_days * 86400) if forget_days > 0 else 0
+
+    data = read_history_store(history_path, read_only)
+    seen: dict[int, int] = {}
+    records = 0
+    for key, accepted_at in HISTORY_RECORD.iter_unpack(data[: len(data) - len(data) % HISTORY_RECORD.size]):
+        records += 1
+        if accepted_at >= cutoff:
+            seen[key] = max(seen.get(key, 0), accepted_at)
+
+    near = LshIndex()
+    near_at: dict[str, int] = {}
+    lsh_entries: dict[str, dict[str, Any]] = {}
+    lsh_lines = 0
+    lsh_path = lsh_path_for(history_path)
+    if lsh_path.exists():
+        for line in lsh_path.read_text(encoding="utf-8").splitlines():
+            lsh_lines += 1
+            try:
+                entry = json.loads(line)
+                accepted_at = int(entry.get("at") or time.time())
+                if accepted_at < cutoff:
+                    continue
+                fp = str(entry["fingerprint"])
+                signature = tuple(int(v) for v in entry["signature"])
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                continue
+            near.add(fp, signature)
+            near_at[fp] = max(near_at.get(fp, 0), accepted_at)
+            lsh_entries[fp] = {**entry, "at": near_at[fp]}
+    if not read_only and (records > 2 * len(seen) + 64 or lsh_lines > 2 * len(lsh_entries) + 64):
+        # Mostly expired or repeated records: rewrite both files once so loads stay
+        # proportional to the forget window.
+        compact_history_store(history_path, seen, lsh_entries)
+    return NoveltyIndex(seen, near, near_at, decay_days, forget_days)
+
+
+def compact_history_store(history_path: Path, seen: dict[int, int], lsh_entries: dict[str, dict[str, Any]]) -> None:
+    """Rewrite <history>.bin and <history>.lsh.jsonl with only the live entries."""
+    store = store_path_for(history_path)
+    tmp = store.with_name(f".{store.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(b"".join(HISTORY_RECORD.pack(key, at) for key, at in sorted(seen.items())))
+    os.replace(tmp, store)
+    lsh_path = lsh_path_for(history_path)
+    tmp = lsh_path.with_name(f".{lsh_path.name}.{os.getpid()}.tmp")
+    # Keep first-seen order: LshIndex.best_match breaks ties by insertion order.
+    tmp.write_text("".join(json.dumps(e) + "\n" for e in lsh_entries.values()), encoding="utf-8")
+    os.replace(tmp, lsh_path)
+
+
+def append_history(history_path: Path, index: NoveltyIndex, rows: list[dict[str, Any]]) -> None:
+    """Record accepted rows: one fixed-size record each, plus their title signatures."""
+    now = int(time.time())
+    records = []
+    lines = []
+    for row in rows:
+        records.append(HISTORY_RECORD.pack(fingerprint_key(row["fingerprint"]), now))
+        index.seen[fingerprint_key(row["fingerprint"])] = now
+        signature = title_signature(str(row.get("title", "")))
+        if signature is None:
+            continue
+        index.near.add(row["fingerprint"], signature)
+        index.near_at[row["fingerprint"]] = now
+        lines.append(
+            json.dumps({"fingerprint": row["fingerprint"], "title": row.get("title", ""), "signature": signature, "at": now})
+        )
+    if records:
+        store = store_path_for(history_path)
+        store.parent.mkdir(parents=True, exist_ok=True)
+        with store.open("ab") as f:
+            f.write(b"".join(records))
+    if lines:
+        with lsh_path_for(history_path).open("a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def parse_history(path: Path) -> set[str]:
+    if not path.exists():
+        return set()
+    lines = [line.strip() for line in path.read_text(encoding="utf-8").splitlines()]
+    return {line for line in lines if line}
+
+
+def fingerprint_for(candidate: dict[str, Any]) -> str:
+    base = normalize(f"{candidate.get('title', '')}|{candidate.get('url', '')}")
+    return hashlib.sha1(base.encode("utf-8")).hexdigest()
+
+
+RISK_TERMS = ("guardrail", "reliability", "security", "ci", "test")
+
+
+def candidate_text(candidate: dict[str, Any]) -> str:
+    return normalize(f"{candidate.get('title', '')} {candidate.get('query', '')}")
+
+
+def scan_candidate(candidate: dict[str, Any], matcher: KeywordMatcher) -> tuple[dict[str, list[str]], bool]:
+    """Keyword hits per group plus the risk-term flag: everything scoring reads from the text."""
+    text = candidate_text(candidate)
+    return matcher.scan(text), any(term in text for term in RISK_TERMS)
+
+
+EVAL_CACHE_MAX_AGE_DAYS = 30
+
+
+def keyword_hash(policy: dict[str, Any]) -> str:
+    # Only keywords feed the scan; thresholds and gates are re-applied on every run.
+    groups = json.dumps(keyword_groups(policy), sort_keys=True, ensure_ascii=True)
+    return hashlib.sha256(groups.encode("utf-8")).hexdigest()[:16]
+
+
+class EvalCache:
+    """Scan results per (candidate fingerprint, policy keyword hash), kept in SQLite across runs.
+
+    A hit also checks a digest of the scanned text, so an item whose query or title
+    changed under the same fingerprint is rescanned. Novelty is never cached.
+    """
+
+    def __init__(self, path: Path, policy_hash: str) -> None:
+        self.path = path
+        self.policy_hash = policy_hash
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS scans (fingerprint TEXT NOT NULL, policy_hash TEXT NOT NULL, "
+            "text_digest TEXT NOT NULL, hits TEXT NOT NULL, risk_term INTEGER NOT NULL, used_at INTEGER NOT NULL, "
+            "PRIMARY KEY (fingerprint, policy_hash))"
+        )
+        self.conn.commit()
+        self.now = int(time.time())
+        self.hits = 0
+        self.misses = 0
+        self._touched: list[tuple[int, str, str]] = []
+        self._pending: list[tuple[Any, ...]] = []
+
+    def prune(self, max_age_days: float = EVAL_CACHE_MAX_AGE_DAYS) -> None:
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM scans WHERE policy_hash != ? OR used_at < ?",
+                (self.policy_hash, self.now - int(max_age_days * 86400)),
+            )
+
+    def scan(
+        self, candidate: dict[str, Any], fingerprint: str, matcher: KeywordMatcher
+    ) -> tuple[dict[str, list[str]], bool]:
+        text = candidate_text(candidate)
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+        found = self.conn.execute(
+            "SELECT text_digest, hits, risk_term FROM scans WHERE fingerprint = ? AND policy_hash = ?",
+            (fingerprint, self.policy_hash),
+        ).fetchone()
+        if found and found[0] == digest:
+            self.hits += 1
+            self._touched.append((self.now, fingerprint, self.policy_hash))
+            return json.loads(found[1]), bool(found[2])
+        self.misses += 1
+        group_hits = matcher.scan(text)
+        risk_term = any(term in text for term in RISK_TERMS)
+        self._pending.append(
+            (fingerprint, self.policy_hash, digest, json.dumps(group_hits, ensure_ascii=True), int(risk_term), self.now)
+        )
+        return group_hits, risk_term
+
+    def flush(self) -> None:
+        if not self._pending and not self._touched:
+            return
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO scans VALUES (?, ?, ?, ?, ?, ?)", self._pending)
+            self.conn.executemany(
+                "UPDATE scans SET used_at = ? WHERE fingerprint = ? AND policy_hash = ?", self._touched
+            )
+        self._pending.clear()
+        self._touched.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def evaluate_candidate(
+    candidate: dict[str, Any],
+    policy: dict[str, Any],
+    seen_fingerprints: set[str] | NoveltyIndex,
+    matcher: KeywordMatcher | None = None,
+    cache: EvalCache | None = None,
+) -> dict[str, Any]:
+    source_type = candidate.get("sourceType", "")
+    matcher = matcher or compile_policy(policy)
+    fp = fingerprint_for(candidate)
+    if cache is not None:
+        group_hits, risk_term = cache.scan(candidate, fp, matcher)
+    else:
+        group_hits, risk_term = scan_candidate(candidate, matcher)
+    focus = {
+        area: group_hits[f"focus:{area}"] for area in policy.get("keywords", {}).get("focus", {})
+    }
+    focus_match_areas = sorted([name for name, hits in focus.items() if hits])
+    focus_hit_count = sum(len(v) for v in focus.values())
+
+    impl_hits = group_hits["implementationEvidence"]
+    action_hits = group_hits["actionability48h"]
+
+    revenue_hits = group_hits["entrepreneur:revenue"]
+    delivery_hits = group_hits["entrepreneur:delivery"]
+    moat_hits = group_hits["entrepreneur:moat"]
+    risk_hits = group_hits["entrepreneur:risk"]
+
+    novelty, novelty_match = candidate_novelty(candidate, fp, seen_fingerprints)
+
+    semantic_relevance = semantic_points(candidate, policy)
+    relevance = max(
+        clamp_0_5((2 if len(focus_match_areas) >= 1 else 0) + min(3, focus_hit_count)), semantic_relevance
+    )
+    implementation_depth = score_component(len(impl_hits), 1 if source_type == "video" else 0)
+    business_leverage = clamp_0_5(
+        score_component(len(revenue_hits), 0)
+        + (1 if delivery_hits else 0)
+        + (1 if moat_hits else 0)
+    )
+    actionability = clamp_0_5(score_component(len(action_hits), 0) + (1 if implementation_depth >= 3 else 0))
+    relevance_total = relevance + implementation_depth + business_leverage + novelty + actionability
+
+    revenue_impact = clamp_0_5(
+        score_component(len(revenue_hits), 0) + (1 if business_leverage >= 3 else 0)
+    )
+    time_saved = clamp_0_5(
+        score_component(len(delivery_hits), 0) + (1 if actionability >= 4 else 0)
+    )
+    moat_strength = clamp_0_5(
+        score_component(len(moat_hits), 0)
+        + (1 if len(focus_match_areas) >= 2 and implementation_depth >= 3 else 0)
+    )
+    risk_reduction = clamp_0_5(score_component(len(risk_hits), 0) + (1 if risk_term else 0))
+    near_term = clamp_0_5(actionability + (1 if implementation_depth >= 3 else 0))
+    entrepreneur_importance = revenue_impact + time_saved + moat_strength + risk_reduction + near_term
+
+    gates_cfg = policy.get("gates", {})
+    gates = {
+        "focusMatch": bool(focus_match_areas) or semantic_relevance > 0,
+        "implementationEvidence": bool(impl_hits),
+        "actionability48h": bool(action_hits),
+        "entrepreneurImportance": bool(
+            revenue_hits or delivery_hits or moat_hits or risk_hits
+        ),
+    }
+
+    gate_failures: list[str] = []
+    if gates_cfg.get("requireFocusMatch", True) and not gates["focusMatch"]:
+        gate_failures.append("no_focus_area_match")
+    if gates_cfg.get("requireImplementationEvidence", True) and not gates["implementationEvidence"]:
+        gate_failures.append("no_implementation_evidence")
+    if gates_cfg.get("requireActionability48h", True) and not gates["actionability48h"]:
+        gate_failures.append("no_48h_actionability")
+    if gates_cfg.get("requireEntrepreneurImportance", True) and not gates["entrepreneurImportance"]:
+        gate_failures.append("no_entrepreneur_importance")
+
+    thresholds = policy.get("thresholds", {})
+    min_relevance = int(thresholds.get("minRelevanceScore", 23))
+    min_importance = int(thresholds.get("minImportanceScore", 18))
+
+    pass_relevance = relevance_total >= min_relevance
+    pass_importance = entrepreneur_importance >= min_importance
+
+    rejection_reasons = list(gate_failures)
+    if not pass_relevance:
+        rejection_reasons.append(f"relevance_below_threshold:{relevance_total}<{min_relevance}")
+    if not pass_importance:
+        rejection_reasons.append(f"importance_below_threshold:{entrepreneur_importance}<{min_importance}")
+
+    passed = not rejection_reasons
+    row = {
+        **candidate,
+        "fingerprint": fp,
+        "focusAreasMatched": focus_match_areas,
+        "keywordHits": {
+            "focus": focus,
+            "implementationEvidence": impl_hits,
+            "actionability48h": action_hits,
+            "entrepreneur": {
+                "revenue": revenue_hits,
+                "delivery": delivery_hits,
+                "moat": moat_hits,
+                "risk": risk_hits,
+            },
+        },
+        "scores": {
+            "relevance": relevance,
+            "implementationDepth": implementation_depth,
+            "businessLeverage": business_leverage,
+            "novelty": novelty,
+            "actionability48h": actionability,
+            "relevanceTotal": relevance_total,
+            "entrepreneurImportance": entrepreneur_importance,
+            "entrepreneurBreakdown": {
+                "revenueImpact": revenue_impact,
+                "timeSavedLeverage": time_saved,
+                "moatStrength": moat_strength,
+                "riskReduction": risk_reduction,
+                "nearTermExecutability": near_term,
+            },
+        },
+        "gates": gates,
+        "passed": passed,
+        "rejectionReasons": rejection_reasons,
+    }
+    if "semantic" in candidate:
+        row["scores"]["semanticRelevance"] = semantic_relevance
+    if novelty_match:
+        row["noveltyMatch"] = novelty_match
+    return row
+
+
+def rank_key(row: dict[str, Any]) -> tuple[Any, Any]:
+    return (row["scores"]["relevanceTotal"] + row["scores"]["entrepreneurImportance"], row.get("rawScore", 0))
+
+
+def iter_json_items(path: Path, read_size: int = 1 << 16) -> Iterator[Any]:
+    """Yield items from a JSON array or a JSONL file without loading the whole file."""
+    with path.open("r", encoding="utf-8") as f:
+        head = f.read(read_size)
+        while head and not head.strip():
+            more = f.read(read_size)
+            if not more:
+                break
+            head += more
+        if not head.lstrip().startswith("["):
+            f.seek(0)
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+            return
+        decoder = json.JSONDecoder()
+        buf = head.lstrip()[1:]
+        eof = False
+        while True:
+            buf = buf.lstrip().lstrip(",").lstrip()
+            if buf.startswith("]"):
+                return
+            try:
+                item, end = decoder.raw_decode(buf)
+                # A number cut at the buffer edge still decodes ("3." -> 3); only trust an item
+                # once the next delimiter is in the buffer.
+                if eof or (end < len(buf) and buf[end] in " \t\r\n,]"):
+                    yield item
+                    buf = buf[end:]
+                    continue
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            more = f.read(read_size)
+            eof = not more
+            buf += more
@@ -2,337 +2,399 @@
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
 import datetime as dt
 import hashlib
-import json
-import re
+import heapq
+import itertools
+import os
+import sys
 from pathlib import Path
-from typing import Any
-
-
-def load_json(path: Path) -> Any:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def save_json(path: Path, payload: Any) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2, ensure_ascii=True)
-        f.write("\n")
-
-
-def normalize(text: str) -> str:
-    return re.sub(r"\s+", " ", text.lower()).strip()
-
-
-def phrase_hits(text: str, phrases: list[str]) -> list[str]:
-    hay = normalize(text)
-    hits: list[str] = []
-    for phrase in phrases:
-        p = normalize(phrase)
-        if not p:
-            continue
-        if " " in p:
-            if p in hay:
-                hits.append(phrase)
-            continue
-        if re.search(rf"\b{re.escape(p)}[a-z0-9\-]*\b", hay):
-            hits.append(phrase)
-    return sorted(set(hits))
-
-
-def clamp_0_5(value: float) -> int:
-    if value < 0:
-        return 0
-    if value > 5:
-        return 5
-    return int(round(value))
-
-
-def score_component(hit_count: int, bias: int = 0) -> int:
-    if hit_count <= 0:
-        return 0
-    return min(5, hit_count + bias)
-
-
-def build_candidates(videos: list[dict[str, Any]], hn_items: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    candidates: list[dict[str, Any]] = []
-
-    for item in videos:
-        candidates.append(
-            {
-                "sourceType": "video",
-                "id": item.get("id", ""),
-                "title": item.get("title", ""),
-                "url": item.get("url", ""),
-                "query": item.get("query", ""),
-                "uploader": item.get("uploader", ""),
-                "rawScore": item.get("score", 0),
-                "meta": {
-                    "view_count": item.get("view_count", 0),
-                    "upload_date": item.get("upload_date", ""),
-                },
-            }
-        )
-
-    for item in hn_items:
-        candidates.append(
-            {
-                "sourceType": "news",
-                "id": item.get("hn_url", item.get("url", "")),
-                "title": item.get("title", ""),
-                "url": item.get("url", "") or item.get("hn_url", ""),
-                "query": item.get("query", ""),
-                "uploader": "hn",
-                "rawScore": item.get("score", 0),
-                "meta": {
-                    "points": item.get("points", 0),
-                    "comments": item.get("comments", 0),
-                    "created_at": item.get("created_at", ""),
-                },
-            }
-        )
-
-    dedup: dict[str, dict[str, Any]] = {}
-    for c in candidates:
-        key = normalize(f"{c.get('title', '')}|{c.get('url', '')}")
-        if not key:
-            continue
-        if key not in dedup:
-            dedup[key] = c
-            continue
-        if float(c.get("rawScore", 0)) > float(dedup[key].get("rawScore", 0)):
-            dedup[key] = c
-    return list(dedup.values())
-
-
-def novelty_score(fingerprint: str, seen_fingerprints: set[str]) -> int:
-    if fingerprint in seen_fingerprints:
-        return 1
-    return 5
-
-
-def parse_history(path: Path) -> set[str]:
-    if not path.exists():
-        return set()
-    lines = [line.strip() for line in path.read_text(encoding="utf-8").splitlines()]
-    return {line for line in lines if line}
-
-
-def write_history(path: Path, fingerprints: set[str]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    payload = "\n".join(sorted(fingerprints))
-    if payload:
-        payload += "\n"
-    path.write_text(payload, encoding="utf-8")
-
-
-def fingerprint_for(candidate: dict[str, Any]) -> str:
-    base = normalize(f"{candidate.get('title', '')}|{candidate.get('url', '')}")
-    return hashlib.sha1(base.encode("utf-8")).hexdigest()
-
-
-def area_hits(text: str, area_keywords: dict[str, list[str]]) -> dict[str, list[str]]:
-    return {area: phrase_hits(text, words) for area, words in area_keywords.items()}
-
-
-def evaluate_candidate(
-    candidate: dict[str, Any],
+from typing import Any, Iterable, Iterator
+
+from research_signal_core import (
+    EvalCache,
+    NEAR_DUP_THRESHOLD,
+    NearDupClusterer,
+    NoveltyIndex,
+    append_history,
+    build_candidates,
+    candidate_key,
+    compile_policy,
+    evaluate_candidate,
+    iter_json_items,
+    iter_source_candidates,
+    keyword_hash,
+    load_json,
+    load_novelty_index,
+    near_dup_threshold,
+    news_candidate,
+    rank_key,
+    save_json,
+    video_candidate,
+)
+
+
+def build_payload(
     policy: dict[str, Any],
-    seen_fingerprints: set[str],
+    candidate_count: int,
+    accepted: list[dict[str, Any]],
+    rejected_count: int,
+    rejected_top: list[dict[str, Any]],
 ) -> dict[str, Any]:
-    title = candidate.get("title", "")
-    query = candidate.get("query", "")
-    source_type = candidate.get("sourceType", "")
-    text = normalize(f"{title} {query}")
-
-    kw = policy.get("keywords", {})
-    focus_kw = kw.get("focus", {})
-    impl_kw = kw.get("implementationEvidence", [])
-    action_kw = kw.get("actionability48h", [])
-    entrepreneur_kw = kw.get("entrepreneurImportance", {})
-
-    focus = area_hits(text, focus_kw)
-    focus_match_areas = sorted([name for name, hits in focus.items() if hits])
-    focus_hit_count = sum(len(v) for v in focus.values())
-
-    impl_hits = phrase_hits(text, impl_kw)
-    action_hits = phrase_hits(text, action_kw)
-
-    revenue_hits = phrase_hits(text, entrepreneur_kw.get("revenue", []))
-    delivery_hits = phrase_hits(text, entrepreneur_kw.get("delivery", []))
-    moat_hits = phrase_hits(text, entrepreneur_kw.get("moat", []))
-    risk_hits = phrase_hits(text, entrepreneur_kw.get("risk", []))
-
-    fp = fingerprint_for(candidate)
-    novelty = novelty_score(fp, seen_fingerprints)
-
-    relevance = clamp_0_5((2 if len(focus_match_areas) >= 1 else 0) + min(3, focus_hit_count))
-    implementation_depth = score_component(len(impl_hits), 1 if source_type == "video" else 0)
-    business_leverage = clamp_0_5(
-        score_component(len(revenue_hits), 0)
-        + (1 if delivery_hits else 0)
-        + (1 if moat_hits else 0)
-    )
-    actionability = clamp_0_5(score_component(len(action_hits), 0) + (1 if implementation_depth >= 3 else 0))
-    relevance_total = relevance + implementation_depth + business_leverage + novelty + actionability
-
-    revenue_impact = clamp_0_5(
-        score_component(len(revenue_hits), 0) + (1 if business_leverage >= 3 else 0)
-    )
-    time_saved = clamp_0_5(
-        score_component(len(delivery_hits), 0) + (1 if actionability >= 4 else 0)
-    )
-    moat_strength = clamp_0_5(
-        score_component(len(moat_hits), 0)
-        + (1 if len(focus_match_areas) >= 2 and implementation_depth >= 3 else 0)
-    )
-    risk_reduction = clamp_0_5(
-        score_component(len(risk_hits), 0)
-        + (
-            1
-            if any(term in text for term in ("guardrail", "reliability", "security", "ci", "test"))
-            else 0
+    thresholds = policy.get("thresholds", {})
+    min_accepted = int(thresholds.get("minAcceptedSources", 3))
+    blocked = len(accepted) < min_accepted
+    blocked_reason = ""
+    if blocked:
+        blocked_reason = (
+            f"accepted_sources_below_min:{len(accepted)}<{min_accepted}"
         )
-    )
-    near_term = clamp_0_5(actionability + (1 if implementation_depth >= 3 else 0))
-    entrepreneur_importance = revenue_impact + time_saved + moat_strength + risk_reduction + near_term
-
-    gates_cfg = policy.get("gates", {})
-    gates = {
-        "focusMatch": bool(focus_match_areas),
-        "implementationEvidence": bool(impl_hits),
-        "actionability48h": bool(action_hits),
-        "entrepreneurImportance": bool(
-            revenue_hits or delivery_hits or moat_hits or risk_hits
-        ),
+    return {
+        "generatedAt": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "policyVersion": policy.get("version", 1),
+        "thresholds": thresholds,
+        "candidateCount": candidate_count,
+        "acceptedCount": len(accepted),
+        "rejectedCount": rejected_count,
+        "blocked": blocked,
+        "blockedReason": blocked_reason,
+        "accepted": accepted,
+        "rejected": rejected_top,
     }
 
-    gate_failures: list[str] = []
-    if gates_cfg.get("requireFocusMatch", True) and not gates["focusMatch"]:
-        gate_failures.append("no_focus_area_match")
-    if gates_cfg.get("requireImplementationEvidence", True) and not gates["implementationEvidence"]:
-        gate_failures.append("no_implementation_evidence")
-    if gates_cfg.get("requireActionability48h", True) and not gates["actionability48h"]:
-        gate_failures.append("no_48h_actionability")
-    if gates_cfg.get("requireEntrepreneurImportance", True) and not gates["entrepreneurImportance"]:
-        gate_failures.append("no_entrepreneur_importance")
-
-    thresholds = policy.get("thresholds", {})
-    min_relevance = int(thresholds.get("minRelevanceScore", 23))
-    min_importance = int(thresholds.get("minImportanceScore", 18))
-
-    pass_relevance = relevance_total >= min_relevance
-    pass_importance = entrepreneur_importance >= min_importance
 
-    rejection_reasons = list(gate_failures)
-    if not pass_relevance:
-        rejection_reasons.append(f"relevance_below_threshold:{relevance_total}<{min_relevance}")
-    if not pass_importance:
-        rejection_reasons.append(f"importance_below_threshold:{entrepreneur_importance}<{min_importance}")
-
-    passed = not rejection_reasons
-    return {
-        **candidate,
-        "fingerprint": fp,
-        "focusAreasMatched": focus_match_areas,
-        "keywordHits": {
-            "focus": focus,
-            "implementationEvidence": impl_hits,
-            "actionability48h": action_hits,
-            "entrepreneur": {
-                "revenue": revenue_hits,
-                "delivery": delivery_hits,
-                "moat": moat_hits,
-                "risk": risk_hits,
-            },
-        },
-        "scores": {
-            "relevance": relevance,
-            "implementationDepth": implementation_depth,
-            "businessLeverage": business_leverage,
-            "novelty": novelty,
-            "actionability48h": actionability,
-            "relevanceTotal": relevance_total,
-            "entrepreneurImportance": entrepreneur_importance,
-            "entrepreneurBreakdown": {
-                "revenueImpact": revenue_impact,
-                "timeSavedLeverage": time_saved,
-                "moatStrength": moat_strength,
-                "riskReduction": risk_reduction,
-                "nearTermExecutability": near_term,
-            },
-        },
-        "gates": gates,
-        "passed": passed,
-        "rejectionReasons": rejection_reasons,
-    }
+REJECTED_SAMPLE = 25
+
+
+def iter_stream_candidates(
+    videos_path: Path | None,
+    hn_path: Path | None,
+    sources: Iterable[str] = (),
+    errors: list[dict[str, str]] | None = None,
+) -> Iterator[dict[str, Any]]:
+    if videos_path:
+        for item in iter_json_items(videos_path):
+            yield video_candidate(item)
+    if hn_path:
+        for item in iter_json_items(hn_path):
+            yield news_candidate(item)
+    yield from iter_source_candidates(sources, errors)
+
+
+def stream_dedupe_plan(
+    videos_path: Path | None,
+    hn_path: Path | None,
+    near_threshold: float = NEAR_DUP_THRESHOLD,
+    sources: Iterable[str] = (),
+    errors: list[dict[str, str]] | None = None,
+) -> dict[int, tuple[int, list[str]]]:
+    """First pass: winning ordinal -> (output position, near-duplicate urls).
+
+    Mirrors build_candidates. The first occurrence of a title|url key fixes its
+    position, and a strictly higher rawScore later on replaces the row. Keys are then
+    clustered by title in first-occurrence order.
+
+    Memory is O(N) in distinct keys, not O(K): the plan holds a small entry (8-byte
+    digest, scores, first URL) per key, the clusterer one MinHash signature per
+    cluster, and title_signature caches up to 65,536 signatures. That is far less
+    than the candidate rows themselves, which are only held in the top-K heaps.
+    """
+    plan: dict[bytes, list[Any]] = {}  # digest -> [first ordinal, best rawScore, winning ordinal, url, cluster]
+    clusterer = NearDupClusterer(near_threshold)
+    for ordinal, c in enumerate(iter_stream_candidates(videos_path, hn_path, sources, errors)):
+        key = candidate_key(c)
+        if not key:
+            continue
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+        score = float(c.get("rawScore", 0))
+        entry = plan.get(digest)
+        if entry is None:
+            cluster = clusterer.assign(str(c.get("title", ""))) if near_threshold > 0 else len(plan)
+            plan[digest] = [ordinal, score, ordinal, c.get("url", ""), cluster]
+        elif score > entry[1]:
+            entry[1], entry[2] = score, ordinal
+
+    clusters: dict[int, list[list[Any]]] = {}
+    for entry in plan.values():
+        clusters.setdefault(entry[4], []).append(entry)
+    winners: dict[int, tuple[int, list[str]]] = {}
+    for members in clusters.values():
+        best = members[0]
+        for entry in members[1:]:
+            if entry[1] > best[1]:
+                best = entry
+        winners[best[2]] = (members[0][0], [entry[3] for entry in members if entry is not best])
+    return winners
+
+
+_WORKER_STATE: dict[str, Any] = {}
+
+
+def _init_stream_worker(
+    policy: dict[str, Any], seen_fingerprints: set[str] | NoveltyIndex, cache_path: Path | None = None
+) -> None:
+    _WORKER_STATE["policy"] = policy
+    _WORKER_STATE["seen"] = seen_fingerprints
+    _WORKER_STATE["matcher"] = compile_policy(policy)
+    _WORKER_STATE["cache"] = EvalCache(cache_path, keyword_hash(policy)) if cache_path else None
+
+
+def push_top(heap: list[tuple[Any, ...]], k: int, row: dict[str, Any], order: int) -> None:
+    # Ties keep input order, as the stable sort in the in-memory path does.
+    entry = (*rank_key(row), -order, row)
+    if len(heap) < k:
+        heapq.heappush(heap, entry)
+    elif entry[:3] > heap[0][:3]:
+        heapq.heapreplace(heap, entry)
+
+
+def evaluate_chunk(
+    chunk: list[tuple[int, dict[str, Any]]], k_accepted: int, k_rejected: int
+) -> tuple[list[tuple[Any, ...]], list[tuple[Any, ...]], int, int, int]:
+    policy, seen, matcher = _WORKER_STATE["policy"], _WORKER_STATE["seen"], _WORKER_STATE["matcher"]
+    cache: EvalCache | None = _WORKER_STATE.get("cache")
+    accepted: list[tuple[Any, ...]] = []
+    rejected: list[tuple[Any, ...]] = []
+    passed = 0
+    cache_hits = cache.hits if cache else 0
+    for order, candidate in chunk:
+        row = evaluate_candidate(candidate, policy, seen, matcher, cache)
+        if row["passed"]:
+            passed += 1
+            push_top(accepted, k_accepted, row, order)
+        else:
+            push_top(rejected, k_rejected, row, order)
+    if cache:
+        cache.flush()
+        cache_hits = cache.hits - cache_hits
+    return accepted, rejected, passed, len(chunk) - passed, cache_hits
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    it = iter(items)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+
+def stream_evaluate(
+    args: argparse.Namespace,
+    policy: dict[str, Any],
+    seen_fingerprints: set[str] | NoveltyIndex,
+    videos_path: Path | None,
+    hn_path: Path | None,
+    cache: EvalCache | None = None,
+    source_errors: list[dict[str, str]] | None = None,
+    scorer: Any = None,
+) -> tuple[int, list[dict[str, Any]], int, list[dict[str, Any]]]:
+    """Chunked, parallel evaluation keeping only bounded top-K heaps of rows.
+
+    Workers open their own connection to the evaluation cache; the shared cache only
+    collects their hit/miss counts. Semantic annotation runs here, one batch per chunk,
+    so the vector cache has a single writer.
+    """
+    winners = stream_dedupe_plan(videos_path, hn_path, near_dup_threshold(policy), args.sources, source_errors)
+    candidate_count = len(winners)
+
+    def selected() -> Iterator[tuple[int, dict[str, Any]]]:
+        for ordinal, c in enumerate(iter_stream_candidates(videos_path, hn_path, args.sources)):
+            if ordinal in winners:
+                position, near_urls = winners[ordinal]
+                if near_urls:
+                    c = {**c, "nearDuplicateCount": len(near_urls), "nearDuplicates": near_urls[:5]}
+                yield position, c
+
+    k_accepted = int(policy.get("thresholds", {}).get("maxAcceptedSources", 5))
+    accepted_heap: list[tuple[Any, ...]] = []
+    rejected_heap: list[tuple[Any, ...]] = []
+    rejected_count = 0
+    workers = max(1, args.workers)
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_stream_worker,
+        initargs=(policy, seen_fingerprints, cache.path if cache else None),
+    ) as pool:
+        in_flight: set[concurrent.futures.Future] = set()
+        chunks = chunked(selected(), max(1, args.chunk_size))
+
+        def merge(done: Iterable[concurrent.futures.Future]) -> None:
+            nonlocal rejected_count
+            for future in done:
+                acc, rej, n_passed, n_rejected, cache_hits = future.result()
+                rejected_count += n_rejected
+                if cache:
+                    cache.hits += cache_hits
+                    cache.misses += n_passed + n_rejected - cache_hits
+                for _, _, neg_order, row in acc:
+                    push_top(accepted_heap, k_accepted, row, -neg_order)
+                for _, _, neg_order, row in rej:
+                    push_top(rejected_heap, REJECTED_SAMPLE, row, -neg_order)
+
+        for chunk in chunks:
+            # Bounded submission keeps at most two chunks per worker in memory.
+            if len(in_flight) >= workers * 2:
+                done, in_flight = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                merge(done)
+            if scorer is not None:
+                chunk = list(zip([order for order, _ in chunk], scorer.annotate([c for _, c in chunk])))
+            in_flight.add(pool.submit(evaluate_chunk, chunk, k_accepted, REJECTED_SAMPLE))
+        merge(concurrent.futures.as_completed(in_flight))
+
+    accepted = [entry[-1] for entry in sorted(accepted_heap, key=lambda e: e[:3], reverse=True)]
+    rejected_top = [entry[-1] for entry in sorted(rejected_heap, key=lambda e: e[:3], reverse=True)]
+    return candidate_count, accepted, rejected_count, rejected_top
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Strict research signal gate with entrepreneur weighting.")
     parser.add_argument("--policy", required=True)
-    parser.add_argument("--videos", required=True)
-    parser.add_argument("--hn", required=True)
+    parser.add_argument("--videos", default="", help="Ranked-video JSON/JSONL")
+    parser.add_argument("--hn", default="", help="HN items JSON/JSONL")
+    parser.add_argument(
+        "--sources",
+        nargs="*",
+        default=[],
+        help="Radar queue files (globs ok), e.g. 'radar-system/queue/*-signals-*.json'; see SOURCE_ADAPTERS",
+    )
     parser.add_argument("--history", required=True)
     parser.add_argument("--output", required=True)
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read JSON/JSONL inputs incrementally and score in a process pool, keeping only top-K rows "
+        "(dedupe state still grows with the number of distinct candidates)",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Process pool size for --stream")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Candidates per worker task for --stream")
+    parser.add_argument(
+        "--engine",
+        choices=("scalar", "numpy"),
+        default="scalar",
+        help="numpy: score all candidates as array operations (requires numpy; ignored with --stream)",
+    )
+    parser.add_argument(
+        "--eval-cache",
+        default="",
+        help="SQLite cache of keyword scans reused across runs (default: <history>.evalcache.sqlite)",
+    )
+    parser.add_argument("--no-eval-cache", action="store_true", help="Rescan every candidate")
+    parser.add_argument(
+        "--index",
+        default="",
+        help="Accepted-sources SQLite index to upsert into (default: accepted_sources.sqlite next to --history)",
+    )
+    parser.add_argument("--no-index", action="store_true", help="Do not update the accepted-sources index")
+    parser.add_argument(
+        "--semantic",
+        choices=("off", "auto", "model", "lsa"),
+        default="off",
+        help="Add cosine similarity to focus areas as a relevance component (requires numpy; model also "
+        "needs sentence-transformers)",
+    )
+    parser.add_argument(
+        "--semantic-cache", default="", help="Directory for cached title vectors (default: <history>.vectors/)"
+    )
     args = parser.parse_args()
+    if not (args.videos or args.hn or args.sources):
+        parser.error("nothing to gate: pass --videos, --hn and/or --sources")
 
     policy_path = Path(args.policy).expanduser()
-    videos_path = Path(args.videos).expanduser()
-    hn_path = Path(args.hn).expanduser()
+    videos_path = Path(args.videos).expanduser() if args.videos else None
+    hn_path = Path(args.hn).expanduser() if args.hn else None
     history_path = Path(args.history).expanduser()
     out_path = Path(args.output).expanduser()
 
     policy = load_json(policy_path)
-    videos = load_json(videos_path)
-    hn_items = load_json(hn_path)
-    seen_fingerprints = parse_history(history_path)
-
-    candidates = build_candidates(videos=videos, hn_items=hn_items)
-    evaluated = [evaluate_candidate(c, policy, seen_fingerprints) for c in candidates]
-    evaluated_sorted = sorted(
-        evaluated,
-        key=lambda x: (
-            x["scores"]["relevanceTotal"] + x["scores"]["entrepreneurImportance"],
-            x.get("rawScore", 0),
-        ),
-        reverse=True,
-    )
-
+    seen_fingerprints = load_novelty_index(history_path, policy.get("novelty"))
+    near_threshold = near_dup_threshold(policy)
     thresholds = policy.get("thresholds", {})
     max_accepted = int(thresholds.get("maxAcceptedSources", 5))
-    min_accepted = int(thresholds.get("minAcceptedSources", 3))
-
-    accepted = [row for row in evaluated_sorted if row.get("passed")][:max_accepted]
-    rejected = [row for row in evaluated_sorted if not row.get("passed")]
-
-    updated_history = set(seen_fingerprints)
-    for row in accepted:
-        updated_history.add(row["fingerprint"])
-    write_history(history_path, updated_history)
-
-    blocked = len(accepted) < min_accepted
-    blocked_reason = ""
-    if blocked:
-        blocked_reason = (
-            f"accepted_sources_below_min:{len(accepted)}<{min_accepted}"
+    cache = None
+    if not args.no_eval_cache:
+        cache_path = Path(args.eval_cache).expanduser() if args.eval_cache else history_path.with_name(
+            history_path.name + ".evalcache.sqlite"
         )
-
-    payload = {
-        "generatedAt": dt.datetime.now(dt.timezone.utc).isoformat(),
-        "policyVersion": policy.get("version", 1),
-        "thresholds": thresholds,
-        "candidateCount": len(candidates),
-        "acceptedCount": len(accepted),
-        "rejectedCount": len(rejected),
-        "blocked": blocked,
-        "blockedReason": blocked_reason,
-        "accepted": accepted,
-        "rejected": rejected[:25],
-    }
+        cache = EvalCache(cache_path, keyword_hash(policy))
+        cache.prune()
+
+    source_errors: list[dict[str, str]] = []
+    scorer = None
+    if args.semantic != "off":
+        try:
+            from research_signal_semantic import build_scorer
+        except ImportError:
+            sys.stderr.write("--semantic requires numpy (pip install numpy)\n")
+            return 2
+        vector_dir = Path(args.semantic_cache).expanduser() if args.semantic_cache else history_path.with_name(
+            history_path.name + ".vectors"
+        )
+        sample = (str(c.get("title", "")) for c in iter_stream_candidates(videos_path, hn_path, args.sources))
+        try:
+            scorer = build_scorer(policy, args.semantic, vector_dir, sample)
+        except ImportError:
+            sys.stderr.write("--semantic model requires sentence-transformers (pip install sentence-transformers)\n")
+            return 2
+
+    if args.stream:
+        candidate_count, accepted, rejected_count, rejected_top = stream_evaluate(
+            args, policy, seen_fingerprints, videos_path, hn_path, cache, source_errors, scorer
+        )
+    elif args.engine == "numpy":
+        try:
+            from research_signal_matrix import evaluate_matrix
+        except ImportError:
+            sys.stderr.write("--engine numpy requires numpy (pip install numpy)\n")
+            return 2
+        candidates = build_candidates(
+            load_json(videos_path) if videos_path else [],
+            load_json(hn_path) if hn_path else [],
+            near_threshold,
+            iter_source_candidates(args.sources, source_errors),
+        )
+        if scorer is not None:
+            candidates = scorer.annotate(candidates)
+        accepted, rejected_count, rejected_top = evaluate_matrix(
+            candidates, policy, seen_fingerprints, max_accepted, REJECTED_SAMPLE, compile_policy(policy), cache
+        )
+        candidate_count = len(candidates)
+    else:
+        videos = load_json(videos_path) if videos_path else []
+        hn_items = load_json(hn_path) if hn_path else []
+        candidates = build_candidates(
+            videos=videos,
+            hn_items=hn_items,
+            near_threshold=near_threshold,
+            extra=iter_source_candidates(args.sources, source_errors),
+        )
+        if scorer is not None:
+            candidates = scorer.annotate(candidates)
+        matcher = compile_policy(policy)
+        evaluated = [evaluate_candidate(c, policy, seen_fingerprints, matcher, cache) for c in candidates]
+        evaluated_sorted = sorted(evaluated, key=rank_key, reverse=True)
+        accepted = [row for row in evaluated_sorted if row.get("passed")][:max_accepted]
+        rejected = [row for row in evaluated_sorted if not row.get("passed")]
+        candidate_count, rejected_count, rejected_top = len(candidates), len(rejected), rejected[:REJECTED_SAMPLE]
+
+    append_history(history_path, seen_fingerprints, accepted)
+
+    payload = build_payload(policy, candidate_count, accepted, rejected_count, rejected_top)
+    if source_errors:
+        payload["sourceErrors"] = source_errors
+    if scorer is not None:
+        scorer.close()
+        payload["semantic"] = scorer.stats()
+    if cache is not None:
+        cache.close()
+        payload["evalCache"] = cache.stats()
     save_json(out_path, payload)
+
+    if not args.no_index:
+        from research_sources_index import default_index_path, open_index, upsert_accepted
+
+        index_path = Path(args.index).expanduser() if args.index else default_index_path(history_path)
+        conn = open_index(index_path)
+        upsert_accepted(conn, accepted, payload["generatedAt"], payload["policyVersion"])
+        conn.close()
     return 0
 
 
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""NumPy scoring engine for research_signal_gate.py (``--engine numpy``).
+
+Keyword hits are still extracted with one automaton scan per candidate. After that,
+every score component, gate and threshold is an array operation over a
+candidates x keyword-group count matrix. Only the rows that reach the output are
+turned back into dicts, in the same shape evaluate_candidate returns.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from research_signal_core import (
+    EvalCache,
+    KeywordMatcher,
+    NoveltyIndex,
+    candidate_novelty,
+    compile_policy,
+    fingerprint_for,
+    scan_candidate,
+    semantic_points,
+)
+
+ENTREPRENEUR_BUCKETS = ("revenue", "delivery", "moat", "risk")
+
+
+@dataclass
+class HitMatrix:
+    candidates: list[dict[str, Any]]
+    hits: list[dict[str, list[str]]]
+    groups: list[str]
+    focus_areas: list[str]
+    counts: np.ndarray  # (candidates, groups) distinct-phrase hit counts
+    is_video: np.ndarray
+    novelty: np.ndarray
+    risk_term: np.ndarray
+    raw_score: np.ndarray
+    fingerprints: list[str]
+    novelty_matches: list[dict[str, Any] | None]
+    semantic_relevance: np.ndarray
+
+    def column(self, group: str) -> np.ndarray:
+        return self.counts[:, self.groups.index(group)]
+
+
+def build_hit_matrix(
+    candidates: list[dict[str, Any]],
+    policy: dict[str, Any],
+    seen_fingerprints: set[str] | NoveltyIndex,
+    matcher: KeywordMatcher | None = None,
+    cache: EvalCache | None = None,
+) -> HitMatrix:
+    matcher = matcher or compile_policy(policy)
+    groups = list(matcher.groups)
+    n = len(candidates)
+    counts = np.zeros((n, len(groups)), dtype=np.int64)
+    is_video = np.zeros(n, dtype=bool)
+    novelty = np.zeros(n, dtype=np.int64)
+    risk_term = np.zeros(n, dtype=bool)
+    raw_score = np.zeros(n, dtype=np.float64)
+    hits: list[dict[str, list[str]]] = []
+    fingerprints: list[str] = []
+    novelty_matches: list[dict[str, Any] | None] = []
+    semantic_relevance = np.array([semantic_points(c, policy) for c in candidates], dtype=np.int64)
+    for i, candidate in enumerate(candidates):
+        fp = fingerprint_for(candidate)
+        fingerprints.append(fp)
+        found, risk_term[i] = cache.scan(candidate, fp, matcher) if cache else scan_candidate(candidate, matcher)
+        hits.append(found)
+        counts[i] = [len(found[g]) for g in groups]
+        is_video[i] = candidate.get("sourceType", "") == "video"
+        novelty[i], match = candidate_novelty(candidate, fp, seen_fingerprints)
+        novelty_matches.append(match)
+        raw_score[i] = float(candidate.get("rawScore", 0))
+    return HitMatrix(
+        candidates=candidates,
+        hits=hits,
+        groups=groups,
+        focus_areas=list(policy.get("keywords", {}).get("focus", {})),
+        counts=counts,
+        is_video=is_video,
+        novelty=novelty,
+        risk_term=risk_term,
+        raw_score=raw_score,
+        fingerprints=fingerprints,
+        novelty_matches=novelty_matches,
+        semantic_relevance=semantic_relevance,
+    )
+
+
+def _component(hit_count: np.ndarray, bias: np.ndarray | int = 0) -> np.ndarray:
+    return np.where(hit_count <= 0, 0, np.minimum(5, hit_count + bias))
+
+
+def _clamp(values: np.ndarray) -> np.ndarray:
+    return np.clip(values, 0, 5)
+
+
+def score_arrays(m: HitMatrix) -> dict[str, np.ndarray]:
+    """Same arithmetic as evaluate_candidate, one array per score component."""
+    focus = np.stack([m.column(f"focus:{a}") for a in m.focus_areas], axis=1) if m.focus_areas else np.zeros(
+        (len(m.candidates), 0), dtype=np.int64
+    )
+    areas_matched = (focus > 0).sum(axis=1)
+    focus_hit_count = focus.sum(axis=1)
+    impl = m.column("implementationEvidence")
+    action = m.column("actionability48h")
+    revenue, delivery, moat, risk = (m.column(f"entrepreneur:{b}") for b in ENTREPRENEUR_BUCKETS)
+
+    relevance = np.maximum(
+        _clamp(np.where(areas_matched >= 1, 2, 0) + np.minimum(3, focus_hit_count)), m.semantic_relevance
+    )
+    implementation_depth = _component(impl, m.is_video.astype(np.int64))
+    business_leverage = _clamp(_component(revenue) + (delivery > 0) + (moat > 0))
+    actionability = _clamp(_component(action) + (implementation_depth >= 3))
+    relevance_total = relevance + implementation_depth + business_leverage + m.novelty + actionability
+
+    revenue_impact = _clamp(_component(revenue) + (business_leverage >= 3))
+    time_saved = _clamp(_component(delivery) + (actionability >= 4))
+    moat_strength = _clamp(_component(moat) + ((areas_matched >= 2) & (implementation_depth >= 3)))
+    risk_reduction = _clamp(_component(risk) + m.risk_term)
+    near_term = _clamp(actionability + (implementation_depth >= 3))
+    return {
+        "areasMatched": areas_matched,
+        "relevance": relevance,
+        "semanticRelevance": m.semantic_relevance,
+        "implementationDepth": implementation_depth,
+        "businessLeverage": business_leverage,
+        "novelty": m.novelty,
+        "actionability48h": actionability,
+        "relevanceTotal": relevance_total,
+        "entrepreneurImportance": revenue_impact + time_saved + moat_strength + risk_reduction + near_term,
+        "revenueImpact": revenue_impact,
+        "timeSavedLeverage": time_saved,
+        "moatStrength": moat_strength,
+        "riskReduction": risk_reduction,
+        "nearTermExecutability": near_term,
+        "impl": impl,
+        "action": action,
+        "entrepreneurAny": (revenue + delivery + moat + risk) > 0,
+    }
+
+
+GATE_FLAGS = (
+    ("focusMatch", "requireFocusMatch", "no_focus_area_match"),
+    ("implementationEvidence", "requireImplementationEvidence", "no_implementation_evidence"),
+    ("actionability48h", "requireActionability48h", "no_48h_actionability"),
+    ("entrepreneurImportance", "requireEntrepreneurImportance", "no_entrepreneur_importance"),
+)
+
+
+def gate_arrays(scores: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    return {
+        "focusMatch": (scores["areasMatched"] > 0) | (scores["semanticRelevance"] > 0),
+        "implementationEvidence": scores["impl"] > 0,
+        "actionability48h": scores["action"] > 0,
+        "entrepreneurImportance": scores["entrepreneurAny"],
+    }
+
+
+def passed_mask(scores: dict[str, np.ndarray], gates: dict[str, np.ndarray], policy: dict[str, Any]) -> np.ndarray:
+    """Candidates that clear the policy's enabled gates and both thresholds."""
+    gates_cfg = policy.get("gates", {})
+    thresholds = policy.get("thresholds", {})
+    passed = scores["relevanceTotal"] >= int(thresholds.get("minRelevanceScore", 23))
+    passed &= scores["entrepreneurImportance"] >= int(thresholds.get("minImportanceScore", 18))
+    for gate, flag, _ in GATE_FLAGS:
+        if gates_cfg.get(flag, True):
+            passed &= gates[gate]
+    return passed
+
+
+def rank_order(m: HitMatrix, scores: dict[str, np.ndarray]) -> np.ndarray:
+    # Descending (total, rawScore), ties in input order, like the stable sorted(reverse=True).
+    total = scores["relevanceTotal"] + scores["entrepreneurImportance"]
+    return np.lexsort((np.arange(len(m.candidates)), -m.raw_score, -total))
+
+
+def materialize_row(
+    m: HitMatrix, scores: dict[str, np.ndarray], gates: dict[str, np.ndarray], policy: dict[str, Any], i: int
+) -> dict[str, Any]:
+    hits = m.hits[i]
+    focus = {area: hits[f"focus:{area}"] for area in m.focus_areas}
+    gates_cfg = policy.get("gates", {})
+    thresholds = policy.get("thresholds", {})
+    min_relevance = int(thresholds.get("minRelevanceScore", 23))
+    min_importance = int(thresholds.get("minImportanceScore", 18))
+    relevance_total = int(scores["relevanceTotal"][i])
+    importance = int(scores["entrepreneurImportance"][i])
+
+    row_gates = {name: bool(gates[name][i]) for name, _, _ in GATE_FLAGS}
+    reasons = [reason for name, flag, reason in GATE_FLAGS if gates_cfg.get(flag, True) and not row_gates[name]]
+    if relevance_total < min_relevance:
+        reasons.append(f"relevance_below_threshold:{relevance_total}<{min_relevance}")
+    if importance < min_importance:
+        reasons.append(f"importance_below_threshold:{importance}<{min_importance}")
+    row = {
+        **m.candidates[i],
+        "fingerprint": m.fingerprints[i],
+        "focusAreasMatched": sorted([name for name, found in focus.items() if found]),
+        "keywordHits": {
+            "focus": focus,
+            "implementationEvidence": hits["implementationEvidence"],
+            "actionability48h": hits["actionability48h"],
+            "entrepreneur": {b: hits[f"entrepreneur:{b}"] for b in ENTREPRENEUR_BUCKETS},
+        },
+        "scores": {
+            "relevance": int(scores["relevance"][i]),
+            "implementationDepth": int(scores["implementationDepth"][i]),
+            "businessLeverage": int(scores["businessLeverage"][i]),
+            "novelty": int(scores["novelty"][i]),
+            "actionability48h": int(scores["actionability48h"][i]),
+            "relevanceTotal": relevance_total,
+            "entrepreneurImportance": importance,
+            "entrepreneurBreakdown": {
+                key: int(scores[key][i])
+                for key in ("revenueImpact", "timeSavedLeverage", "moatStrength", "riskReduction", "nearTermExecutability")
+            },
+        },
+        "gates": row_gates,
+        "passed": not reasons,
+        "rejectionReasons": reasons,
+    }
+    if "semantic" in m.candidates[i]:
+        row["scores"]["semanticRelevance"] = int(scores["semanticRelevance"][i])
+    if m.novelty_matches[i]:
+        row["noveltyMatch"] = m.novelty_matches[i]
+    return row
+
+
+def evaluate_matrix(
+    candidates: list[dict[str, Any]],
+    policy: dict[str, Any],
+    seen_fingerprints: set[str] | NoveltyIndex,
+    max_accepted: int,
+    rejected_sample: int,
+    matcher: KeywordMatcher | None = None,
+    cache: EvalCache | None = None,
+) -> tuple[list[dict[str, Any]], int, list[dict[str, Any]]]:
+    """Returns (accepted rows, rejected count, first rejected rows) in output order."""
+    m = build_hit_matrix(candidates, policy, seen_fingerprints, matcher, cache)
+    scores = score_arrays(m)
+    gates = gate_arrays(scores)
+    passed = passed_mask(scores, gates, policy)
+    order = rank_order(m, scores)
+    ranked_passed = passed[order]
+    accepted_idx = order[ranked_passed][:max_accepted]
+    rejected_idx = order[~ranked_passed]
+    accepted = [materialize_row(m, scores, gates, policy, int(i)) for i in accepted_idx]
+    rejected_top = [materialize_row(m, scores, gates, policy, int(i)) for i in rejected_idx[:rejected_sample]]
+    return accepted, int(len(rejected_idx)), rejected_top
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""What-if replay of research_signal_gate policy variants over archived candidates.
+
+Scores depend only on keywords and novelty, so hits and scores are computed once, and
+each variant only re-applies its thresholds and gates. Nothing is written except the
+optional --output report; the history file is read-only here.
+
+Variants override thresholds/gates of the base policy:
+  --variant loose:minRelevanceScore=15,minImportanceScore=6
+  --variant no-action:requireActionability48h=false
+  --variants variants.json   # [{"name": ..., "thresholds": {...}, "gates": {...}}]
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import datetime as dt
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from research_signal_core import (
+    NoveltyIndex,
+    build_candidates,
+    candidate_key,
+    compile_policy,
+    evaluate_candidate,
+    expand_source_globs,
+    iter_json_items,
+    iter_source_candidates,
+    load_json,
+    load_novelty_index,
+    near_dup_threshold,
+    rank_key,
+    save_json,
+)
+
+THRESHOLD_KEYS = ("minRelevanceScore", "minImportanceScore", "minAcceptedSources", "maxAcceptedSources")
+GATE_KEYS = (
+    "requireFocusMatch",
+    "requireImplementationEvidence",
+    "requireActionability48h",
+    "requireEntrepreneurImportance",
+)
+GATE_FOR_FLAG = {
+    "requireFocusMatch": "focusMatch",
+    "requireImplementationEvidence": "implementationEvidence",
+    "requireActionability48h": "actionability48h",
+    "requireEntrepreneurImportance": "entrepreneurImportance",
+}
+
+
+def parse_variant(spec: str) -> dict[str, Any]:
+    name, _, body = spec.partition(":")
+    variant: dict[str, Any] = {"name": name.strip(), "thresholds": {}, "gates": {}}
+    for part in body.split(","):
+        key, _, value = part.partition("=")
+        key, value = key.strip(), value.strip()
+        if not key:
+            continue
+        if key in THRESHOLD_KEYS:
+            variant["thresholds"][key] = int(value)
+        elif key in GATE_KEYS:
+            variant["gates"][key] = value.lower() in {"1", "true", "yes", "on"}
+        else:
+            raise ValueError(f"unknown variant key '{key}' (only thresholds and gates can vary)")
+    return variant
+
+
+def apply_variant(policy: dict[str, Any], variant: dict[str, Any]) -> dict[str, Any]:
+    unknown = set(variant) - {"name", "thresholds", "gates"}
+    if unknown:
+        raise ValueError(f"variant '{variant.get('name')}' changes {sorted(unknown)}; only thresholds and gates can vary")
+    varied = copy.deepcopy(policy)
+    varied.setdefault("thresholds", {}).update(variant.get("thresholds") or {})
+    varied.setdefault("gates", {}).update(variant.get("gates") or {})
+    return varied
+
+
+def row_passes(row: dict[str, Any], policy: dict[str, Any]) -> bool:
+    gates_cfg = policy.get("gates", {})
+    thresholds = policy.get("thresholds", {})
+    for flag, gate in GATE_FOR_FLAG.items():
+        if gates_cfg.get(flag, True) and not row["gates"][gate]:
+            return False
+    scores = row["scores"]
+    return scores["relevanceTotal"] >= int(thresholds.get("minRelevanceScore", 23)) and scores[
+        "entrepreneurImportance"
+    ] >= int(thresholds.get("minImportanceScore", 18))
+
+
+def variant_masks(
+    candidates: list[dict[str, Any]], seen: set[str] | NoveltyIndex, base: dict[str, Any], policies: list[dict[str, Any]]
+) -> tuple[list[list[bool]], list[int]]:
+    """Pass flags per variant plus the shared rank order (best first)."""
+    matcher = compile_policy(base)
+    try:
+        from research_signal_matrix import build_hit_matrix, gate_arrays, passed_mask, rank_order, score_arrays
+    except ImportError:
+        rows = [evaluate_candidate(c, base, seen, matcher) for c in candidates]
+        order = sorted(range(len(rows)), key=lambda i: rank_key(rows[i]), reverse=True)
+        return [[row_passes(row, p) for row in rows] for p in policies], order
+    m = build_hit_matrix(candidates, base, seen, matcher)
+    scores = score_arrays(m)
+    gates = gate_arrays(scores)
+    order = [int(i) for i in rank_order(m, scores)]
+    return [passed_mask(scores, gates, p).tolist() for p in policies], order
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return round(len(a & b) / len(a | b), 4)
+
+
+def load_items(paths: list[str]) -> list[dict[str, Any]]:
+    items: list[dict[str, Any]] = []
+    for path in expand_source_globs(paths):
+        items.extend(iter_json_items(path))
+    return items
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay signal gate policy variants without side effects.")
+    parser.add_argument("--policy", required=True, help="Base policy (keywords are shared by every variant)")
+    parser.add_argument("--videos", nargs="*", default=[], help="Archived ranked-video JSON/JSONL files (globs ok)")
+    parser.add_argument("--hn", nargs="*", default=[], help="Archived HN JSON/JSONL files (globs ok)")
+    parser.add_argument("--sources", nargs="*", default=[], help="Archived radar queue files (globs ok)")
+    parser.add_argument("--history", default="", help="Read-only fingerprint history for novelty (default: all novel)")
+    parser.add_argument("--variant", action="append", default=[], help="name:key=value,... (repeatable)")
+    parser.add_argument("--variants", default="", help="JSON file with a list of {name, thresholds, gates}")
+    parser.add_argument("--output", default="", help="Write the report here instead of stdout")
+    args = parser.parse_args()
+
+    base = load_json(Path(args.policy).expanduser())
+    try:
+        variants = [{"name": "base", "thresholds": {}, "gates": {}}]
+        if args.variants:
+            variants.extend(load_json(Path(args.variants).expanduser()))
+        variants.extend(parse_variant(spec) for spec in args.variant)
+        policies = [apply_variant(base, v) for v in variants]
+    except ValueError as exc:
+        sys.stderr.write(f"{exc}\n")
+        return 2
+
+    seen: set[str] | NoveltyIndex = set()
+    if args.history:
+        seen = load_novelty_index(Path(args.history).expanduser(), base.get("novelty"), read_only=True)
+    candidates = build_candidates(
+        load_items(args.videos), load_items(args.hn), near_dup_threshold(base), iter_source_candidates(args.sources)
+    )
+    masks, order = variant_masks(candidates, seen, base, policies)
+    keys = [candidate_key(c) for c in candidates]
+
+    passing_sets: list[set[str]] = []
+    accepted_sets: list[set[str]] = []
+    reports = []
+    for variant, policy, mask in zip(variants, policies, masks):
+        thresholds = policy.get("thresholds", {})
+        max_accepted = int(thresholds.get("maxAcceptedSources", 5))
+        min_accepted = int(thresholds.get("minAcceptedSources", 3))
+        ranked = [i for i in order if mask[i]]
+        accepted = ranked[:max_accepted]
+        passing_sets.append({keys[i] for i in ranked})
+        accepted_sets.append({keys[i] for i in accepted})
+        reports.append(
+            {
+                "name": variant.get("name", ""),
+                "thresholds": thresholds,
+                "gates": policy.get("gates", {}),
+                "passingCount": len(ranked),
+                "acceptedCount": len(accepted),
+                "blocked": len(accepted) < min_accepted,
+                "accepted": [
+                    {"title": candidates[i].get("title", ""), "url": candidates[i].get("url", "")} for i in accepted
+                ],
+            }
+        )
+    for i, report in enumerate(reports):
+        report["overlapWithBase"] = {
+            "passingJaccard": jaccard(passing_sets[i], passing_sets[0]),
+            "passingShared": len(passing_sets[i] & passing_sets[0]),
+            "acceptedShared": len(accepted_sets[i] & accepted_sets[0]),
+        }
+
+    payload = {
+        "generatedAt": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "policyVersion": base.get("version", 1),
+        "candidateCount": len(candidates),
+        "variants": reports,
+        "passingJaccard": {
+            a["name"]: {b["name"]: jaccard(passing_sets[i], passing_sets[j]) for j, b in enumerate(reports)}
+            for i, a in enumerate(reports)
+        },
+    }
+    if args.output:
+        save_json(Path(args.output).expanduser(), payload)
+    else:
+        print(json.dumps(payload, indent=2, ensure_ascii=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""Semantic relevance for research_signal_gate.py (``--semantic``).
+
+Focus areas are embedded once from their names and keywords (or from the descriptions in
+``policy.semantic.areas``). Candidate titles are embedded in batches and cached by
+fingerprint in a memory-mapped float32 matrix, so a repeat run only embeds titles it has
+not seen. Each candidate is annotated with its closest focus area and cosine similarity.
+The gate turns that into relevance points (see semantic_points).
+
+Backends:
+  model  a sentence-transformers model on CPU (optional dependency)
+  lsa    TF-IDF over stemmed title words, projected onto an LSA basis. The basis is
+         fitted once per focus-area set from the first run's titles and stored with
+         the vectors, so cached vectors stay comparable between runs.
+  auto   model when sentence-transformers is installed, else lsa
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+
+from research_signal_core import fingerprint_for, fingerprint_key, title_shingles
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+BATCH_SIZE = 256
+LSA_DIMENSIONS = 128
+LSA_VOCABULARY = 8192
+LSA_FIT_SAMPLE = 4000
+CACHE_MAX_ROWS = 500_000
+
+
+def area_descriptions(policy: dict[str, Any]) -> dict[str, str]:
+    custom = policy.get("semantic", {}).get("areas", {})
+    focus = policy.get("keywords", {}).get("focus", {})
+    return {
+        area: custom.get(area) or f"{area.replace('_', ' ')}: {', '.join(words)}" for area, words in focus.items()
+    }
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+
+class LsaEmbedder:
+    def __init__(self, vocabulary: list[str], idf: np.ndarray, basis: np.ndarray) -> None:
+        self.vocabulary = vocabulary
+        self.columns = {term: i for i, term in enumerate(vocabulary)}
+        self.idf = idf.astype(np.float32)
+        self.basis = basis.astype(np.float32)
+        self.dimensions = self.basis.shape[1]
+        self.model_id = "lsa-" + hashlib.sha1(self.basis.tobytes()).hexdigest()[:12]
+
+    @classmethod
+    def fit(cls, texts: list[str], dimensions: int = LSA_DIMENSIONS) -> "LsaEmbedder":
+        docs = [title_shingles(t) for t in texts]
+        df: dict[str, int] = {}
+        for terms in docs:
+            for term in terms:
+                df[term] = df.get(term, 0) + 1
+        # Terms seen once carry no co-occurrence signal for the basis, unless the corpus is tiny.
+        min_df = 2 if len(docs) >= 50 else 1
+        vocabulary = sorted((t for t, n in df.items() if n >= min_df), key=lambda t: (-df[t], t))[:LSA_VOCABULARY]
+        idf = np.array([math.log((1 + len(docs)) / (1 + df[t])) + 1 for t in vocabulary], dtype=np.float32)
+        embedder = cls(vocabulary, idf, np.eye(len(vocabulary), 1, dtype=np.float32))
+        x = embedder.tfidf(texts)
+        k = max(1, min(dimensions, x.shape[0] - 1, x.shape[1] - 1))
+        # Randomized SVD: project onto k+10 random directions, then take the exact SVD
+        # of the small (k+10) x vocabulary matrix.
+        omega = np.random.default_rng(0).standard_normal((x.shape[1], k + 10)).astype(np.float32)
+        q, _ = np.linalg.qr(x @ omega)
+        _, _, vt = np.linalg.svd(q.T @ x, full_matrices=False)
+        return cls(vocabulary, idf, vt[:k].T)
+
+    @classmethod
+    def load(cls, path: Path) -> "LsaEmbedder":
+        with np.load(path) as data:
+            return cls(json.loads(str(data["vocabulary"])), data["idf"], data["basis"])
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp.npz")
+        np.savez(tmp, vocabulary=json.dumps(self.vocabulary), idf=self.idf, basis=self.basis)
+        tmp.replace(path)
+
+    def tfidf(self, texts: list[str]) -> np.ndarray:
+        x = np.zeros((len(texts), len(self.vocabulary)), dtype=np.float32)
+        for i, text in enumerate(texts):
+            cols = [self.columns[t] for t in title_shingles(text) if t in self.columns]
+            x[i, cols] = self.idf[cols]
+        return _unit_rows(x)
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        return _unit_rows(self.tfidf(texts) @ self.basis)
+
+
+class ModelEmbedder:
+    def __init__(self, name: str = DEFAULT_MODEL) -> None:
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(name, device="cpu")
+        self.dimensions = int(self.model.get_sentence_embedding_dimension())
+        self.model_id = "st-" + hashlib.sha1(name.encode("utf-8")).hexdigest()[:12]
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, batch_size=BATCH_SIZE, normalize_embeddings=True, convert_to_numpy=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class VectorCache:
+    """Fingerprint-keyed vectors: <model_id>.f32 (rows, memory-mapped) + <model_id>.keys (uint64 per row).
+
+    New rows are appended to both files, vectors first. Only rows present in both files
+    count, so a torn append is ignored on the next open and cut off by the next append.
+    """
+
+    def __init__(self, directory: Path, model_id: str, dimensions: int) -> None:
+        self.directory = directory
+        self.dimensions = dimensions
+        self.data_path = directory / f"{model_id}.f32"
+        self.keys_path = directory / f"{model_id}.keys"
+        self._open()
+
+    def _open(self) -> None:
+        keys = np.fromfile(self.keys_path, dtype="<u8") if self.keys_path.exists() else np.zeros(0, dtype="<u8")
+        data_rows = self.data_path.stat().st_size // (4 * self.dimensions) if self.data_path.exists() else 0
+        rows = min(len(keys), data_rows)
+        self.index = {int(k): i for i, k in enumerate(keys[:rows])}
+        self.matrix = (
+            np.memmap(self.data_path, dtype=np.float32, mode="r", shape=(rows, self.dimensions))
+            if rows
+            else np.zeros((0, self.dimensions), dtype=np.float32)
+        )
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def lookup(self, keys: list[int]) -> tuple[np.ndarray, list[int]]:
+        """Cached vectors (zero rows where missing) and the positions that were missing."""
+        vectors = np.zeros((len(keys), self.dimensions), dtype=np.float32)
+        missing: list[int] = []
+        for i, key in enumerate(keys):
+            row = self.index.get(key)
+            if row is None:
+                missing.append(i)
+            else:
+                vectors[i] = self.matrix[row]
+        return vectors, missing
+
+    def append(self, keys: list[int], vectors: np.ndarray) -> None:
+        if not keys:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Drop any torn tail first so new rows land at the offsets the keys point to.
+        rows = len(self.matrix)
+        for path, size in ((self.data_path, rows * 4 * self.dimensions), (self.keys_path, rows * 8)):
+            if path.exists() and path.stat().st_size > size:
+                os.truncate(path, size)
+        with self.data_path.open("ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with self.keys_path.open("ab") as f:
+            f.write(np.asarray(keys, dtype="<u8").tobytes())
+        self._open()
+
+    def compact(self, keep: Iterable[int]) -> None:
+        kept = sorted((self.index[k], k) for k in set(keep) if k in self.index)
+        rows = [row for row, _ in kept]
+        keys = np.array([key for _, key in kept], dtype="<u8")
+        vectors = np.array(self.matrix[rows], dtype=np.float32)
+        self.matrix = np.zeros((0, self.dimensions), dtype=np.float32)
+        for path, payload in ((self.data_path, vectors.tobytes()), (self.keys_path, keys.tobytes())):
+            tmp = path.with_name(f".{path.name}.tmp")
+            tmp.write_bytes(payload)
+            tmp.replace(path)
+        self._open()
+
+
+class SemanticScorer:
+    def __init__(
+        self, embedder: LsaEmbedder | ModelEmbedder, backend: str, descriptions: dict[str, str], cache_dir: Path | None
+    ) -> None:
+        self.embedder = embedder
+        self.backend = backend
+        self.areas = list(descriptions)
+        self.area_vectors = embedder.embed(list(descriptions.values())) if descriptions else None
+        self.cache = VectorCache(cache_dir, embedder.model_id, embedder.dimensions) if cache_dir else None
+        self.used: set[int] = set()
+        self.embedded = 0
+        self.cached = 0
+        self.embed_seconds = 0.0
+
+    def vectors(self, candidates: list[dict[str, Any]]) -> np.ndarray:
+        keys = [fingerprint_key(fingerprint_for(c)) for c in candidates]
+        self.used.update(keys)
+        if self.cache is not None:
+            vectors, missing = self.cache.lookup(keys)
+        else:
+            vectors, missing = np.zeros((len(keys), self.embedder.dimensions), dtype=np.float32), list(range(len(keys)))
+        self.cached += len(keys) - len(missing)
+        started = time.perf_counter()
+        fresh_keys: list[int] = []
+        fresh: list[np.ndarray] = []
+        for batch in (missing[i : i + BATCH_SIZE] for i in range(0, len(missing), BATCH_SIZE)):
+            batch_vectors = self.embedder.embed([str(candidates[i].get("title", "")) for i in batch])
+            vectors[batch] = batch_vectors
+            fresh_keys.extend(keys[i] for i in batch)
+            fresh.append(batch_vectors)
+        self.embed_seconds += time.perf_counter() - started
+        self.embedded += len(missing)
+        if self.cache is not None and fresh:
+            self.cache.append(fresh_keys, np.concatenate(fresh))
+        return vectors
+
+    def annotate(self, candidates: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Copies of candidates with {"semantic": {"area", "similarity"}} attached."""
+        if not candidates or self.area_vectors is None:
+            return candidates
+        similarity = self.vectors(candidates) @ self.area_vectors.T
+        best = similarity.argmax(axis=1)
+        return [
+            {**c, "semantic": {"area": self.areas[j], "similarity": round(float(similarity[i, j]), 3)}}
+            for i, (c, j) in enumerate(zip(candidates, best))
+        ]
+
+    def close(self) -> None:
+        if self.cache is not None and len(self.cache) > CACHE_MAX_ROWS:
+            self.cache.compact(self.used)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "model": self.embedder.model_id,
+            "embedded": self.embedded,
+            "cached": self.cached,
+            "embedSeconds": round(self.embed_seconds, 3),
+            "titlesPerSecond": round(self.embedded / self.embed_seconds, 1) if self.embedded else None,
+        }
+
+
+def build_scorer(
+    policy: dict[str, Any], backend: str, cache_dir: Path | None, sample_titles: Iterable[str] = ()
+) -> SemanticScorer:
+    """Raises ImportError when backend='model' and sentence-transformers is missing."""
+    descriptions = area_descriptions(policy)
+    if backend in {"model", "auto"}:
+        try:
+            model = ModelEmbedder(str(policy.get("semantic", {}).get("model") or DEFAULT_MODEL))
+            return SemanticScorer(model, "model", descriptions, cache_dir)
+        except ImportError:
+            if backend == "model":
+                raise
+    focus_hash = hashlib.sha1(json.dumps(descriptions, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    basis_path = cache_dir / f"lsa-basis-{focus_hash}.npz" if cache_dir else None
+    if basis_path is not None and basis_path.exists():
+        embedder = LsaEmbedder.load(basis_path)
+    else:
+        titles = list(itertools.islice(sample_titles, LSA_FIT_SAMPLE))
+        embedder = LsaEmbedder.fit(list(descriptions.values()) + titles)
+        if basis_path is not None:
+            embedder.save(basis_path)
+    return SemanticScorer(embedder, "lsa", descriptions, cache_dir)
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""Rolling index of the sources research_signal_gate.py accepted.
+
+The gate upserts its accepted rows after every run, so consumers query one SQLite file
+instead of globbing and parsing every past signals-*.json:
+
+  python3 research_sources_index.py query --focus codex_workflows --since 30d
+  python3 research_sources_index.py query --match "review agent" --type video --limit 10
+  python3 research_sources_index.py import memory/research/.state/signals-*.json   # backfill
+
+One row per fingerprint keeps the latest accepted copy plus when it was first and
+last accepted. Focus areas, source type and acceptance time are indexed, and titles
+go into an FTS5 table (or a word-prefix scan where SQLite lacks FTS5). --match words
+match the start of title words either way, so "archit" finds "Architecture".
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Iterable
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    fingerprint TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    source_type TEXT NOT NULL,
+    accepted_at TEXT NOT NULL,
+    first_accepted_at TEXT NOT NULL,
+    relevance_total INTEGER NOT NULL,
+    entrepreneur_importance INTEGER NOT NULL,
+    policy_version INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sources_accepted ON sources (accepted_at);
+CREATE INDEX IF NOT EXISTS sources_type_accepted ON sources (source_type, accepted_at);
+CREATE TABLE IF NOT EXISTS source_focus (
+    area TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    accepted_at TEXT NOT NULL,
+    PRIMARY KEY (area, fingerprint)
+);
+CREATE INDEX IF NOT EXISTS source_focus_accepted ON source_focus (area, accepted_at);
+CREATE INDEX IF NOT EXISTS source_focus_fingerprint ON source_focus (fingerprint);
+"""
+
+
+def parse_iso(value: str | None) -> dt.datetime:
+    """UTC datetime; naive values are taken as UTC, unparseable ones as the epoch."""
+    try:
+        parsed = dt.datetime.fromisoformat(str(value or "").replace("Z", "+00:00"))
+    except ValueError:
+        return dt.datetime.fromtimestamp(0, tz=dt.timezone.utc)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt.timezone.utc)
+    return parsed.astimezone(dt.timezone.utc)
+
+
+def parse_window(value: str) -> dt.datetime | None:
+    """'30d', '24h', '30m' (relative to now) or an ISO timestamp."""
+    if not value:
+        return None
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([dhm])", value.strip())
+    if match:
+        unit = {"d": "days", "h": "hours", "m": "minutes"}[match.group(2)]
+        return dt.datetime.now(dt.timezone.utc) - dt.timedelta(**{unit: float(match.group(1))})
+    return parse_iso(value)
+
+
+def default_index_path(history_path: Path) -> Path:
+    return history_path.parent / "accepted_sources.sqlite"
+
+
+def utc_stamp(value: str) -> str:
+    # One fixed format so accepted_at compares correctly as text.
+    return parse_iso(value).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def open_index(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS source_titles USING fts5(title, fingerprint UNINDEXED)")
+    except sqlite3.OperationalError:
+        pass  # no FTS5 in this SQLite build; --match falls back to a word-prefix scan
+    conn.commit()
+    return conn
+
+
+def open_index_readonly(path: Path) -> sqlite3.Connection:
+    """Open an existing index without creating or changing it; FileNotFoundError if it is missing."""
+    if not path.is_file():
+        raise FileNotFoundError(path)
+    return sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True, timeout=30)
+
+
+def has_fts(conn: sqlite3.Connection) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'source_titles'").fetchone() is not None
+
+
+def row_focus_areas(row: dict[str, Any]) -> list[str]:
+    areas = set(row.get("focusAreasMatched") or [])
+    if row.get("scores", {}).get("semanticRelevance"):
+        areas.add(str(row.get("semantic", {}).get("area") or ""))
+    return sorted(a for a in areas if a)
+
+
+def upsert_accepted(
+    conn: sqlite3.Connection, rows: Iterable[dict[str, Any]], generated_at: str, policy_version: int = 1
+) -> int:
+    """Index one gate run's accepted rows. Replaying an older run never overwrites a newer copy."""
+    at = utc_stamp(generated_at)
+    fts = has_fts(conn)
+    written = 0
+    with conn:
+        for row in rows:
+            fp = str(row.get("fingerprint") or "")
+            if not fp:
+                continue
+            scores = row.get("scores", {})
+            values = (
+                str(row.get("title") or ""),
+                str(row.get("url") or ""),
+                str(row.get("sourceType") or ""),
+                at,
+                int(scores.get("relevanceTotal", 0)),
+                int(scores.get("entrepreneurImportance", 0)),
+                int(policy_version),
+                json.dumps(row, ensure_ascii=True),
+            )
+            conn.execute(
+                "UPDATE sources SET first_accepted_at = ? WHERE fingerprint = ? AND first_accepted_at > ?", (at, fp, at)
+            )
+            current = conn.execute(
+                "INSERT INTO sources (title, url, source_type, accepted_at, relevance_total, entrepreneur_importance, "
+                "policy_version, data, fingerprint, first_accepted_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (fingerprint) DO UPDATE SET title = excluded.title, url = excluded.url, "
+                "source_type = excluded.source_type, accepted_at = excluded.accepted_at, "
+                "relevance_total = excluded.relevance_total, entrepreneur_importance = excluded.entrepreneur_importance, "
+                "policy_version = excluded.policy_version, data = excluded.data "
+                "WHERE excluded.accepted_at >= sources.accepted_at",
+                (*values, fp, at),
+            ).rowcount
+            if not current:
+                continue
+            conn.execute("DELETE FROM source_focus WHERE fingerprint = ?", (fp,))
+            conn.executemany(
+                "INSERT INTO source_focus (area, fingerprint, accepted_at) VALUES (?, ?, ?)",
+                [(area, fp, at) for area in row_focus_areas(row)],
+            )
+            if fts:
+                conn.execute("DELETE FROM source_titles WHERE fingerprint = ?", (fp,))
+                conn.execute("INSERT INTO source_titles (title, fingerprint) VALUES (?, ?)", (values[0], fp))
+            written += 1
+    return written
+
+
+def match_words(text: str) -> list[str]:
+    # Split like FTS5's default unicode61 tokenizer, so both --match paths see the same words.
+    return re.findall(r"\w+", text.lower())
+
+
+def fts_query(text: str) -> str:
+    # Every word must start a title word; quoting keeps FTS operators from being parsed.
+    return " ".join(f'"{word}"*' for word in match_words(text))
+
+
+def has_word_prefix(title: str, word: str) -> bool:
+    return any(w.startswith(word) for w in match_words(title or ""))
+
+
+def query_sources(
+    conn: sqlite3.Connection,
+    focus: str = "",
+    source_type: str = "",
+    since: str = "",
+    until: str = "",
+    match: str = "",
+    limit: int = 50,
+) -> list[dict[str, Any]]:
+    """Accepted rows, newest first. since/until take '30d'/'24h' or ISO timestamps."""
+    sql = ["SELECT s.data, s.accepted_at, s.first_accepted_at FROM sources s"]
+    where: list[str] = []
+    params: list[Any] = []
+    if focus:
+        sql.append("JOIN source_focus f ON f.fingerprint = s.fingerprint AND f.area = ?")
+        params.append(focus)
+    if source_type:
+        where.append("s.source_type = ?")
+        params.append(source_type)
+    for op, value in ((">=", parse_window(since)), ("<=", parse_window(until))):
+        if value is not None:
+            where.append(f"s.accepted_at {op} ?")
+            params.append(value.strftime("%Y-%m-%dT%H:%M:%SZ"))
+    if match_words(match):
+        if has_fts(conn):
+            where.append("s.fingerprint IN (SELECT fingerprint FROM source_titles WHERE source_titles MATCH ?)")
+            params.append(fts_query(match))
+        else:
+            conn.create_function("has_word_prefix", 2, has_word_prefix, deterministic=True)
+            for word in match_words(match):
+                where.append("has_word_prefix(s.title, ?)")
+                params.append(word)
+    if where:
+        sql.append("WHERE " + " AND ".join(where))
+    sql.append("ORDER BY s.accepted_at DESC, s.relevance_total + s.entrepreneur_importance DESC")
+    if limit:
+        sql.append("LIMIT ?")
+        params.append(limit)
+    return [
+        {**json.loads(data), "acceptedAt": accepted_at, "firstAcceptedAt": first_accepted_at}
+        for data, accepted_at, first_accepted_at in conn.execute(" ".join(sql), params)
+    ]
+
+
+def cmd_query(args: argparse.Namespace) -> int:
+    try:
+        conn = open_index_readonly(args.index)
+    except FileNotFoundError:
+        sys.stderr.write(f"no index at {args.index}; run research_signal_gate.py or 'import' first\n")
+        return 1
+    for row in query_sources(conn, args.focus, args.type, args.since, args.until, args.match, args.limit):
+        sys.stdout.write(json.dumps(row, ensure_ascii=True) + "\n")
+    return 0
+
+
+def cmd_import(args: argparse.Namespace) -> int:
+    conn = open_index(args.index)
+    summary = {"files": 0, "written": 0, "errors": []}
+    for raw in args.outputs:
+        path = Path(raw).expanduser()
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            summary["errors"].append({"path": str(path), "error": str(exc)})
+            continue
+        summary["files"] += 1
+        summary["written"] += upsert_accepted(
+            conn, payload.get("accepted") or [], str(payload.get("generatedAt") or ""), payload.get("policyVersion", 1)
+        )
+    print(json.dumps(summary, ensure_ascii=True))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Query the index of accepted research sources.")
+    parser.add_argument(
+        "--index",
+        type=Path,
+        default=Path.home() / ".openclaw" / "workspace" / "memory" / "research" / ".state" / "accepted_sources.sqlite",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    q = sub.add_parser("query", help="Print matching accepted rows as JSONL, newest first")
+    q.add_argument("--focus", default="", help="Focus area, e.g. codex_workflows")
+    q.add_argument("--type", default="", help="sourceType: video, news, repo, web")
+    q.add_argument("--since", default="", help="'30d', '24h' or an ISO timestamp")
+    q.add_argument("--until", default="")
+    q.add_argument("--match", default="", help="Words that must all start a word of the title")
+    q.add_argument("--limit", type=int, default=50)
+    q.set_defaults(func=cmd_query)
+
+    imp = sub.add_parser("import", help="Backfill from past research_signal_gate outputs")
+    imp.add_argument("outputs", nargs="+")
+    imp.set_defaults(func=cmd_import)
+
+    args = parser.parse_args()
+    args.index = args.index.expanduser()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Shared store of video IDs the harvesters have already handled.
+
+Every ID is kept as a 64-bit hash with when and why it was recorded, in fixed-size
+binary records appended to ``<seen file>.bin``. The first lookup loads the live
+records into one int-keyed dict. Records older than their reason's max age are
+dropped at load, so an expired video can be recommended again. The file is rewritten
+once most of its records are expired or repeated. Appends and that rewrite hold an
+exclusive lock on ``<seen file>.bin.lock``, so a compaction in one harvester never
+drops records another harvester is appending. A legacy one-ID-per-line seen file is
+imported once, stamped with its mtime.
+
+Used in-process by source_adapt_recommend.py and from shell by value_resource_harvest.sh:
+
+  python3 seen_store.py --file "$SEEN_FILE" filter <ids.txt     # print unseen IDs
+  python3 seen_store.py --file "$SEEN_FILE" add --reason queued ID...
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import fcntl
+import hashlib
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Iterator
+
+SEEN_RECORD = struct.Struct("<QIB")
+REASONS = ("queued", "skipped")
+# Skipped videos come back sooner than ones we already transcribed.
+SEEN_MAX_AGE_DAYS = {"queued": 365.0, "skipped": 30.0}
+
+
+def seen_key(video_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(video_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class SeenStore:
+    def __init__(self, path: Path, max_age_days: dict[str, float] | None = None) -> None:
+        self.path = path
+        self.store = path.with_name(path.name + ".bin")
+        self.lock_path = path.with_name(path.name + ".bin.lock")
+        self.max_age_days = {**SEEN_MAX_AGE_DAYS, **(max_age_days or {})}
+        self._seen: dict[int, int] | None = None
+        self._pending: list[bytes] = []
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.lock_path.open("a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _cutoffs(self, now: int) -> list[int]:
+        # Indexed by reason code; a max age of 0 or less never expires.
+        return [int(now - self.max_age_days[r] * 86400) if self.max_age_days[r] > 0 else 0 for r in REASONS]
+
+    def _read(self) -> bytes:
+        if self.store.exists():
+            return self.store.read_bytes()
+        if not self.path.exists():
+            return b""
+        with self._locked():
+            if self.store.exists():
+                return self.store.read_bytes()
+            stamp = int(self.path.stat().st_mtime)
+            ids = {line.strip() for line in self.path.read_text(encoding="utf-8").splitlines() if line.strip()}
+            data = b"".join(SEEN_RECORD.pack(seen_key(i), stamp, 0) for i in sorted(ids))
+            if data:
+                self.store.write_bytes(data)
+            return data
+
+    def _parse(self, data: bytes) -> tuple[dict[int, int], int]:
+        cutoffs = self._cutoffs(int(time.time()))
+        seen: dict[int, int] = {}
+        records = 0
+        for key, at, reason in SEEN_RECORD.iter_unpack(data[: len(data) - len(data) % SEEN_RECORD.size]):
+            records += 1
+            if reason < len(cutoffs) and at >= cutoffs[reason]:
+                # Packed so one int per ID carries both fields; the newest record wins.
+                seen[key] = max(seen.get(key, 0), at << 8 | reason)
+        return seen, records
+
+    def _load(self) -> dict[int, int]:
+        if self._seen is not None:
+            return self._seen
+        seen, records = self._parse(self._read())
+        if records > 2 * len(seen) + 64:
+            with self._locked():
+                # Re-read under the lock so records appended since are kept.
+                seen, _ = self._parse(self.store.read_bytes())
+                self.compact(seen)
+        self._seen = seen
+        return seen
+
+    def __contains__(self, video_id: str) -> bool:
+        return seen_key(video_id) in self._load()
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def unseen(self, video_ids: Iterable[str]) -> list[str]:
+        return [i for i in video_ids if i not in self]
+
+    def add(self, video_id: str, reason: str = "queued") -> None:
+        """Record video_id; written on flush()."""
+        code = REASONS.index(reason)
+        now = int(time.time())
+        self._load()[seen_key(video_id)] = now << 8 | code
+        self._pending.append(SEEN_RECORD.pack(seen_key(video_id), now, code))
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        self.store.parent.mkdir(parents=True, exist_ok=True)
+        with self._locked(), self.store.open("ab") as f:
+            f.write(b"".join(self._pending))
+        self._pending = []
+
+    def compact(self, seen: dict[int, int]) -> None:
+        """Rewrite the store with only seen; the caller holds the lock."""
+        tmp = self.store.with_name(f".{self.store.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(b"".join(SEEN_RECORD.pack(key, v >> 8, v & 0xFF) for key, v in sorted(seen.items())))
+        os.replace(tmp, self.store)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check and record handled video IDs.")
+    parser.add_argument("--file", required=True, help="Seen file; records live in <file>.bin")
+    parser.add_argument(
+        "--max-age-days", type=float, default=None, help="Expire every reason after this many days (0 keeps forever)"
+    )
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("filter", help="Print the IDs from stdin that are not seen, in input order")
+    add = sub.add_parser("add", help="Record IDs as seen")
+    add.add_argument("ids", nargs="+")
+    add.add_argument("--reason", choices=REASONS, default="queued")
+    args = parser.parse_args()
+
+    ages = None if args.max_age_days is None else {r: args.max_age_days for r in REASONS}
+    store = SeenStore(Path(args.file).expanduser(), ages)
+    if args.cmd == "filter":
+        for video_id in store.unseen(line.strip() for line in sys.stdin if line.strip()):
+            print(video_id)
+        return 0
+    for video_id in args.ids:
+        store.add(video_id, args.reason)
+    store.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
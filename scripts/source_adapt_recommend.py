@@ -2,14 +2,23 @@
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
 import datetime as dt
+import hashlib
 import json
 import math
+import os
 import re
+import sqlite3
 import subprocess
+import threading
+import time
 from collections import Counter
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
+
+import transcription_queue
+from seen_store import SEEN_MAX_AGE_DAYS, SeenStore
 
 
 STOPWORDS = {
@@ -105,8 +114,9 @@ DEFAULT_PREFERENCES: dict[str, Any] = {
 }
 
 
-def run_json_lines(cmd: list[str]) -> list[dict]:
-    proc = subprocess.run(cmd, capture_output=True, text=True, check=False)
+def run_json_lines(cmd: list[str], timeout: float | None = None) -> list[dict]:
+    """Parsed JSON lines of cmd's stdout; [] on failure. Raises subprocess.TimeoutExpired."""
+    proc = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=timeout)
     if proc.returncode != 0:
         return []
     rows: list[dict] = []
@@ -140,13 +150,101 @@ def slugify(text: str, fallback: str) -> str:
     return (slug[:48] or fallback).strip("-")
 
 
-def extract_keywords(text: str, limit: int = 16) -> list[str]:
-    tokens = re.findall(r"[a-zA-Z][a-zA-Z0-9\-]{2,}", text.lower())
-    counts = Counter(t for t in tokens if t not in STOPWORDS and len(t) >= 3)
-    for term in ANCHOR_TERMS:
-        if term in text.lower():
-            counts[term] += 3
-    return [w for w, _ in counts.most_common(limit)]
+# Term statistics for every source card live in one JSON store: raw term counts per card
+# plus document frequencies. A run only re-reads cards whose mtime or size changed, and
+# only re-tokenizes those whose content hash changed too. Stopwords are applied at query
+# time, so editing STOPWORDS never forces a rebuild.
+TERM_RE = re.compile(r"[a-z][a-z0-9\-]+")
+TERM_STORE_VERSION = 1
+KEYWORD_HALF_LIFE_DAYS = 21.0
+
+
+def card_terms(text: str) -> dict[str, int]:
+    return dict(Counter(TERM_RE.findall(text.lower())))
+
+
+def load_term_store(path: Path) -> dict[str, Any]:
+    try:
+        store = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        store = None
+    if not isinstance(store, dict) or store.get("version") != TERM_STORE_VERSION:
+        return {"version": TERM_STORE_VERSION, "docs": {}, "df": {}}
+    return store
+
+
+def save_term_store(path: Path, store: dict[str, Any]) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(store, ensure_ascii=True, separators=(",", ":")), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _count_df(df: dict[str, int], terms: Iterable[str], delta: int) -> None:
+    for term in terms:
+        n = df.get(term, 0) + delta
+        if n > 0:
+            df[term] = n
+        else:
+            df.pop(term, None)
+
+
+def update_term_store(store: dict[str, Any], cards: list[Path]) -> dict[str, int]:
+    """Bring the store in line with cards; returns how much work that took."""
+    docs: dict[str, dict[str, Any]] = store["docs"]
+    df: dict[str, int] = store["df"]
+    stats = {"cards": len(cards), "read": 0, "retokenized": 0, "removed": 0}
+    names = set()
+    for card in cards:
+        name = card.name
+        names.add(name)
+        st = card.stat()
+        doc = docs.get(name)
+        if doc and doc["mtimeNs"] == st.st_mtime_ns and doc["size"] == st.st_size:
+            continue
+        text = card.read_text(encoding="utf-8", errors="ignore")
+        stats["read"] += 1
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        if doc and doc["sha1"] == digest:
+            doc["mtimeNs"], doc["size"] = st.st_mtime_ns, st.st_size
+            continue
+        terms = card_terms(text)
+        if doc:
+            _count_df(df, doc["terms"], -1)
+        _count_df(df, terms, 1)
+        docs[name] = {"mtimeNs": st.st_mtime_ns, "size": st.st_size, "sha1": digest, "terms": terms}
+        stats["retokenized"] += 1
+    for name in [n for n in docs if n not in names]:
+        _count_df(df, docs.pop(name)["terms"], -1)
+        stats["removed"] += 1
+    return stats
+
+
+def extract_keywords(
+    store: dict[str, Any], limit: int = 16, half_life_days: float = KEYWORD_HALF_LIFE_DAYS
+) -> list[str]:
+    """Top terms by recency-weighted TF-IDF over every card in the store.
+
+    A card's weight halves every half_life_days before the newest card, so recent cards
+    steer the keywords and older ones still count. Anchor terms present in a card get a
+    flat bonus on top, as the old raw-count ranking gave them.
+    """
+    docs = store["docs"].values()
+    if not docs:
+        return []
+    df = store["df"]
+    n = len(docs)
+    newest = max(doc["mtimeNs"] for doc in docs)
+    scores: Counter[str] = Counter()
+    for doc in docs:
+        weight = 0.5 ** ((newest - doc["mtimeNs"]) / 1e9 / 86400 / max(half_life_days, 1e-9))
+        for term, count in doc["terms"].items():
+            if term in ANCHOR_TERMS:
+                scores[term] += 3 * weight
+            if len(term) < 3 or term in STOPWORDS:
+                continue
+            scores[term] += weight * (1 + math.log(count)) * (math.log((1 + n) / (1 + df[term])) + 1)
+    ranked = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))
+    return [term for term, _ in ranked[:limit]]
 
 
 def parse_upload_date(raw: str) -> dt.date | None:
@@ -218,6 +316,154 @@ def build_queries(keywords: list[str], seed_queries: list[str]) -> list[str]:
     return deduped[:12]
 
 
+SEARCH_CACHE_KEEP_DAYS = 7
+
+
+def search_cache_path(cache_dir: Path, query: str, per_query: int) -> Path:
+    key = hashlib.sha1(f"{per_query}|{query.lower().strip()}".encode("utf-8")).hexdigest()[:20]
+    return cache_dir / f"{key}.json"
+
+
+def read_search_cache(path: Path) -> dict[str, Any] | None:
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    return entry if isinstance(entry, dict) and isinstance(entry.get("rows"), list) else None
+
+
+def write_search_cache(path: Path, query: str, per_query: int, rows: list[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+    payload = {"query": query, "perQuery": per_query, "fetchedAt": time.time(), "rows": rows}
+    tmp.write_text(json.dumps(payload, ensure_ascii=True), encoding="utf-8")
+    tmp.replace(path)
+
+
+def prune_search_cache(cache_dir: Path, max_age_seconds: float) -> None:
+    cutoff = time.time() - max_age_seconds
+    for path in cache_dir.glob("*.json"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            continue
+
+
+def search_query(query: str, per_query: int, deadline: float, cache_path: Path | None = None) -> dict[str, Any]:
+    """One ytsearch, bounded by the shared deadline (a time.monotonic() value).
+
+    Non-empty successful results are written to cache_path when one is given.
+    """
+    started = time.monotonic()
+    remaining = deadline - started
+    if remaining <= 0:
+        return {"query": query, "status": "skipped", "seconds": 0.0, "rows": []}
+    cmd = ["yt-dlp", "--dump-json", "--flat-playlist", "--quiet", f"ytsearch{per_query}:{query}"]
+    try:
+        rows, status = run_json_lines(cmd, timeout=remaining), "ok"
+    except subprocess.TimeoutExpired:
+        rows, status = [], "timeout"
+    # run_json_lines returns [] for a failed search too, so empty results are never cached.
+    if cache_path is not None and rows:
+        write_search_cache(cache_path, query, per_query, rows)
+    return {"query": query, "status": status, "seconds": round(time.monotonic() - started, 2), "rows": rows}
+
+
+def cached_result(query: str, status: str, entry: dict[str, Any], age_seconds: float) -> dict[str, Any]:
+    return {
+        "query": query,
+        "status": status,
+        "seconds": 0.0,
+        "rows": entry["rows"],
+        "ageMinutes": round(age_seconds / 60, 1),
+    }
+
+
+def fan_out_searches(
+    queries: list[str],
+    per_query: int,
+    workers: int,
+    deadline_seconds: float,
+    cache_dir: Path | None = None,
+    ttl_seconds: float = 0.0,
+    stale_seconds: float = 0.0,
+) -> list[dict[str, Any]]:
+    """Run every query with at most `workers` yt-dlp processes; results come back in query order.
+
+    Searches still running at the deadline are killed and searches not yet started are
+    skipped, so the caller merges whatever finished in time.
+
+    With a cache_dir, results younger than ttl_seconds are reused as is ("cached").
+    Results up to stale_seconds past the TTL are served immediately ("stale") and
+    refreshed in the background for the next run. The process waits for those refreshes
+    only at exit, and never past the deadline. A miss whose search fails falls back to
+    any older cached copy ("expired").
+    """
+    deadline = time.monotonic() + deadline_seconds
+    now = time.time()
+    results: list[dict[str, Any]] = []
+    fetches: dict[int, tuple[concurrent.futures.Future, dict[str, Any] | None, float]] = {}
+    revalidate: list[tuple[str, Path]] = []
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        for i, q in enumerate(queries):
+            path = search_cache_path(cache_dir, q, per_query) if cache_dir else None
+            entry = read_search_cache(path) if path else None
+            age = now - float(entry.get("fetchedAt") or 0) if entry else 0.0
+            if entry and age < ttl_seconds:
+                results.append(cached_result(q, "cached", entry, age))
+            elif entry and path and age < ttl_seconds + stale_seconds:
+                results.append(cached_result(q, "stale", entry, age))
+                revalidate.append((q, path))
+            else:
+                results.append({})
+                fetches[i] = (pool.submit(search_query, q, per_query, deadline, path), entry, age)
+        # Misses were submitted first, so refreshes only take workers the misses leave idle.
+        for q, path in revalidate:
+            pool.submit(search_query, q, per_query, deadline, path)
+        for i, (future, entry, age) in fetches.items():
+            result = future.result()
+            if not result["rows"] and entry:
+                result = {**cached_result(queries[i], "expired", entry, age), "seconds": result["seconds"]}
+            results[i] = result
+    finally:
+        pool.shutdown(wait=False)
+    return results
+
+
+def merge_search_results(
+    results: list[dict[str, Any]], keywords: set[str], preferred_uploaders: list[str]
+) -> dict[str, dict]:
+    # Merged in query order whatever order the searches finished in, so ties resolve
+    # exactly as a sequential run would.
+    items_by_id: dict[str, dict] = {}
+    for result in results:
+        q = result["query"]
+        for row in result["rows"]:
+            vid = row.get("id") or ""
+            title = row.get("title") or ""
+            if not vid or not title:
+                continue
+            item = {
+                "id": vid,
+                "title": title,
+                "uploader": row.get("uploader") or "",
+                "upload_date": row.get("upload_date") or "",
+                "view_count": row.get("view_count") or 0,
+                "url": f"https://www.youtube.com/watch?v={vid}",
+                "query": q,
+            }
+            score, overlap, reasons = score_item(item, keywords, preferred_uploaders)
+            item["score"] = round(score, 3)
+            item["overlap"] = overlap
+            item["reasons"] = reasons
+            prev = items_by_id.get(vid)
+            if prev is None or item["score"] > prev["score"]:
+                items_by_id[vid] = item
+    return items_by_id
+
+
 def enforce_uploader_diversity(items: list[dict[str, Any]], max_per_uploader: int) -> list[dict[str, Any]]:
     if max_per_uploader < 1:
         return items
@@ -235,10 +481,52 @@ def enforce_uploader_diversity(items: list[dict[str, Any]], max_per_uploader: in
 def main() -> int:
     p = argparse.ArgumentParser(description="Recommend high-signal sources from recent source cards.")
     p.add_argument("--workspace", default=str(Path.home() / ".openclaw" / "workspace"))
-    p.add_argument("--latest", type=int, default=5, help="How many latest source cards to use.")
+    p.add_argument(
+        "--latest",
+        type=int,
+        default=5,
+        help="How many latest source cards to list in the report (keywords use every card).",
+    )
+    p.add_argument(
+        "--keyword-half-life",
+        type=float,
+        default=KEYWORD_HALF_LIFE_DAYS,
+        help="Days over which an older card's keyword weight halves.",
+    )
     p.add_argument("--per-query", type=int, default=6, help="YouTube results per query.")
     p.add_argument("--max-results", type=int, default=12)
     p.add_argument("--queue", type=int, default=2, help="How many recommendations to queue for transcription.")
+    p.add_argument("--search-workers", type=int, default=4, help="yt-dlp searches to run at once.")
+    p.add_argument(
+        "--search-deadline",
+        type=float,
+        default=90.0,
+        help="Seconds for the whole search fan-out; unfinished searches are dropped.",
+    )
+    p.add_argument(
+        "--search-cache-ttl", type=float, default=6.0, help="Hours a cached search result is reused as is."
+    )
+    p.add_argument(
+        "--search-cache-stale",
+        type=float,
+        default=24.0,
+        help="Further hours a result is still served while it is refreshed in the background.",
+    )
+    p.add_argument("--no-search-cache", action="store_true", help="Always search live.")
+    p.add_argument(
+        "--seen-max-age-days",
+        type=float,
+        default=None,
+        help=f"Days before a queued video can be queued again (default {SEEN_MAX_AGE_DAYS['queued']:g}, 0 = never). "
+        f"Ranked results not queued, and ones passed over by the uploader cap, are skipped for "
+        f"{SEEN_MAX_AGE_DAYS['skipped']:g} days.",
+    )
+    p.add_argument(
+        "--queue-backend",
+        choices=("auto", "jsonl", "sqlite"),
+        default=os.environ.get("TRANSCRIPTION_QUEUE_BACKEND", "auto"),
+        help="Transcription queue backend, as transcription_queue.py --backend (auto follows the queue).",
+    )
     p.add_argument(
         "--preferences",
         default="config/source_preferences.json",
@@ -250,7 +538,6 @@ def main() -> int:
     sources_dir = ws / "memory" / "sources"
     research_dir = ws / "memory" / "research"
     state_dir = research_dir / ".state"
-    queue_script = ws / "scripts" / "transcription_queue.sh"
     seen_file = state_dir / "seen_videos.txt"
     pref_path = Path(args.preferences)
     if not pref_path.is_absolute():
@@ -263,8 +550,7 @@ def main() -> int:
 
     research_dir.mkdir(parents=True, exist_ok=True)
     state_dir.mkdir(parents=True, exist_ok=True)
-    seen_file.touch(exist_ok=True)
-    seen_ids = {line.strip() for line in seen_file.read_text().splitlines() if line.strip()}
+    seen = SeenStore(seen_file, {"queued": args.seen_max_age_days} if args.seen_max_age_days is not None else None)
 
     dated_sources = [
         f
@@ -272,50 +558,51 @@ def main() -> int:
         if re.match(r"^\d{4}-\d{2}-\d{2}-.*\.md$", f.name)
     ]
     pool = dated_sources if dated_sources else list(sources_dir.glob("*.md"))
-    source_files = sorted(pool, key=lambda x: x.stat().st_mtime, reverse=True)[: args.latest]
+    cards = sorted(pool, key=lambda x: x.stat().st_mtime, reverse=True)
+    source_files = cards[: args.latest]
     if not source_files:
         print("no_source_cards_found")
         return 0
 
-    source_text = "\n\n".join(f.read_text(errors="ignore") for f in source_files)
-    keywords = extract_keywords(source_text, limit=16)
+    term_store_path = state_dir / "source_terms.json"
+    term_store = load_term_store(term_store_path)
+    term_stats = update_term_store(term_store, cards)
+    if term_stats["read"] or term_stats["removed"]:
+        save_term_store(term_store_path, term_store)
+    keywords = extract_keywords(term_store, limit=16, half_life_days=args.keyword_half_life)
     keyword_set = set(keywords)
     queries = build_queries(keywords, seed_queries)
 
-    items_by_id: dict[str, dict] = {}
-    for q in queries:
-        cmd = [
-            "yt-dlp",
-            "--dump-json",
-            "--flat-playlist",
-            "--quiet",
-            f"ytsearch{args.per_query}:{q}",
-        ]
-        for row in run_json_lines(cmd):
-            vid = row.get("id") or ""
-            title = row.get("title") or ""
-            if not vid or not title:
-                continue
-            item = {
-                "id": vid,
-                "title": title,
-                "uploader": row.get("uploader") or "",
-                "upload_date": row.get("upload_date") or "",
-                "view_count": row.get("view_count") or 0,
-                "url": f"https://www.youtube.com/watch?v={vid}",
-                "query": q,
-            }
-            score, overlap, reasons = score_item(item, keyword_set, preferred_uploaders)
-            item["score"] = round(score, 3)
-            item["overlap"] = overlap
-            item["reasons"] = reasons
-            prev = items_by_id.get(vid)
-            if prev is None or item["score"] > prev["score"]:
-                items_by_id[vid] = item
+    search_cache_dir = None if args.no_search_cache else state_dir / "search_cache"
+    ttl_seconds = args.search_cache_ttl * 3600
+    stale_seconds = args.search_cache_stale * 3600
+    if search_cache_dir is not None:
+        prune_search_cache(search_cache_dir, max(ttl_seconds + stale_seconds, SEARCH_CACHE_KEEP_DAYS * 86400))
+    search_started = time.monotonic()
+    searches = fan_out_searches(
+        queries,
+        args.per_query,
+        args.search_workers,
+        args.search_deadline,
+        search_cache_dir,
+        ttl_seconds,
+        stale_seconds,
+    )
+    search_seconds = round(time.monotonic() - search_started, 2)
+    items_by_id = merge_search_results(searches, keyword_set, preferred_uploaders)
 
-    ranked = sorted(items_by_id.values(), key=lambda x: x["score"], reverse=True)
-    ranked = enforce_uploader_diversity(ranked, max_per_uploader)
-    ranked = ranked[: args.max_results]
+    # Seen videos are dropped first so they do not take ranked slots from new ones.
+    unseen = sorted(
+        (item for vid, item in items_by_id.items() if vid not in seen), key=lambda x: x["score"], reverse=True
+    )
+    ranked = enforce_uploader_diversity(unseen, max_per_uploader)[: args.max_results]
+    ranked_ids = {item["id"] for item in ranked}
+    # Only results above the last ranked one were passed over by the uploader cap;
+    # the rest merely fell below the list length and stay eligible.
+    considered = unseen[: unseen.index(ranked[-1]) + 1] if ranked else []
+    if len(ranked) < args.max_results:
+        considered = unseen
+    capped = [item["id"] for item in considered if item["id"] not in ranked_ids]
     fallback_only = False
     if not ranked:
         fallback_only = True
@@ -336,22 +623,46 @@ def main() -> int:
                 }
             )
 
-    queued: list[dict] = []
+    chosen: list[dict] = []
     for item in ranked:
-        if len(queued) >= args.queue:
+        if len(chosen) >= args.queue:
             break
         if str(item.get("id") or "").startswith("fallback-"):
             continue
-        if item["id"] in seen_ids:
-            continue
-        slug = slugify(item["title"], f"video-{item['id']}")
-        cmd = [str(queue_script), "add", item["url"], slug, item["title"]]
-        proc = subprocess.run(["bash", *cmd], capture_output=True, text=True, check=False)
-        if proc.returncode == 0:
-            queued.append(item)
-            seen_ids.add(item["id"])
+        chosen.append(item)
 
-    seen_file.write_text("\n".join(sorted(seen_ids)) + ("\n" if seen_ids else ""))
+    queued: list[dict] = []
+    queue_results: list[dict[str, Any]] = []
+    queue_backend = args.queue_backend
+    if chosen:
+        batch = [
+            {
+                "source": item["url"],
+                "slug": slugify(item["title"], f"video-{item['id']}"),
+                "title": item["title"],
+                "lane": "recommendation",
+                "priority": item["score"],
+            }
+            for item in chosen
+        ]
+        try:
+            queue_opts = transcription_queue.queue_args(ws, "--backend", args.queue_backend)
+            queue_backend = queue_opts.backend
+            queue_results = transcription_queue.add_items(queue_opts, batch)
+        except (OSError, sqlite3.Error, ValueError) as exc:
+            queue_results = [{"ok": False, "error": f"{type(exc).__name__}: {exc}"} for _ in chosen]
+        for item, result in zip(chosen, queue_results):
+            if result.get("ok"):
+                queued.append(item)
+                seen.add(item["id"], "queued")
+
+    # Ranked but not chosen, or passed over by the uploader cap: not queued again
+    # until the skip expires.
+    chosen_ids = {item["id"] for item in chosen}
+    skipped = capped + [item["id"] for item in ranked if item["id"] not in chosen_ids and not fallback_only]
+    for vid in skipped:
+        seen.add(vid, "skipped")
+    seen.flush()
 
     today = dt.date.today().isoformat()
     report = research_dir / f"{today}-source-recommendations.md"
@@ -361,6 +672,12 @@ def main() -> int:
     lines.append("## Source Cards Used")
     for f in source_files:
         lines.append(f"- {f.name}")
+    if len(cards) > len(source_files):
+        lines.append(f"- (+{len(cards) - len(source_files)} older cards, recency-weighted)")
+    lines.append(
+        f"- Term store: {term_stats['read']} read, {term_stats['retokenized']} retokenized, "
+        f"{term_stats['removed']} removed of {term_stats['cards']} cards"
+    )
     lines.append("")
     lines.append("## Extracted Preference Keywords")
     lines.append("- " + ", ".join(keywords[:12]))
@@ -369,9 +686,26 @@ def main() -> int:
     for q in queries[:10]:
         lines.append(f"- {q}")
     lines.append("")
+    lines.append("## Search Timing")
+    from_cache = sum(1 for r in searches if r["status"] in {"cached", "stale"})
+    lines.append(
+        f"- {len(searches)} queries in {search_seconds}s "
+        f"(workers={max(1, args.search_workers)}, deadline={args.search_deadline:g}s, from_cache={from_cache})"
+    )
+    for result in searches:
+        age = f" | age={result['ageMinutes']}m" if "ageMinutes" in result else ""
+        lines.append(
+            f"- {result['query']} | status={result['status']} | results={len(result['rows'])} | "
+            f"seconds={result['seconds']}{age}"
+        )
+    lines.append("")
     lines.append("## Quality Filters")
     lines.append("- Prioritize preferred creators and official-first operator sources.")
     lines.append(f"- Uploader diversity cap: {max_per_uploader} per uploader.")
+    lines.append(
+        f"- Skipped {len(skipped)} ranked-but-not-queued or uploader-capped results "
+        f"(not queued for {seen.max_age_days['skipped']:g} days; {len(items_by_id) - len(unseen)} already seen)."
+    )
     lines.append("- Bias toward recent and implementation-focused material.")
     lines.append("")
     lines.append("## Recommended Sources")
@@ -400,9 +734,15 @@ def main() -> int:
         lines.append("- none configured")
     lines.append("")
     lines.append("## Queued For Transcription")
-    if queued:
-        for item in queued:
-            lines.append(f"- [{item['title']}]({item['url']})")
+    if chosen:
+        for item, result in zip(chosen, queue_results):
+            if not result.get("ok"):
+                outcome = f"failed: {result.get('error', 'unknown')}"
+            elif result.get("deduped"):
+                outcome = f"already queued ({result.get('status', 'pending')}) as {result.get('queued', '')}"
+            else:
+                outcome = f"queued as {result.get('queued', '')} ({queue_backend})"
+            lines.append(f"- [{item['title']}]({item['url']}) | {outcome}")
     else:
         lines.append("- none (all top items already queued/seen)")
     lines.append("")
@@ -413,8 +753,9 @@ def main() -> int:
 
     status = "fallback" if fallback_only else "ok"
     print(
-        f"recommend_status={status} sources={len(source_files)} keywords={len(keywords)} "
-        f"recommendations={len(ranked)} queued={len(queued)} report={report}"
+        f"recommend_status={status} sources={len(cards)} keywords={len(keywords)} "
+        f"recommendations={len(ranked)} queued={len(queued)} "
+        f"queue_failed={sum(1 for r in queue_results if not r.get('ok'))} skipped={len(skipped)} search_seconds={search_seconds} report={report}"
     )
     return 0
 
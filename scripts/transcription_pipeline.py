@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""Staged video ingest: fetch -> transcribe -> clean -> source card.
+
+Mirrors tools/yt-transcribe + scripts/ingest_video_source.sh, split so the queue can
+run each stage on its own bounded pool and resume a retried item at the first stage
+that has not completed yet.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+STAGES = ("fetch", "transcribe", "clean", "card")
+DEFAULT_STAGE_WORKERS: dict[str, int] = {"fetch": 2, "transcribe": 1, "clean": 2, "card": 1}
+SUB_LANGS = "en,en-US,en-GB,en.*,en-US.*,en-GB.*"
+VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+VIDEO_URL_ID_RE = re.compile(r"(?:youtu\.be/|[?&]v=|embed/|shorts/|/v/)([A-Za-z0-9_-]{11})")
+
+
+class StageError(Exception):
+    pass
+
+
+@dataclass
+class PipelineContext:
+    workspace: Path
+    work_root: Path
+    timeout_seconds: int
+    env: dict[str, str]
+    cache_root: Path
+    cache_max_bytes: int
+
+
+def load_env_file(path: Path) -> dict[str, str]:
+    # Same KEY=VALUE file yt-transcribe sources (config/transcription.env).
+    values: dict[str, str] = {}
+    if not path.exists():
+        return values
+    for line in path.read_text(encoding="utf-8", errors="ignore").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, _, value = line.removeprefix("export ").partition("=")
+        values[key.strip()] = value.strip().strip("'\"")
+    return values
+
+
+def build_context(workspace: Path, timeout_seconds: int, cache_max_mb: int = 2048) -> PipelineContext:
+    env = dict(os.environ)
+    env.update(load_env_file(workspace / "config" / "transcription.env"))
+    env["OPENCLAW_WORKSPACE_DIR"] = str(workspace)
+    return PipelineContext(
+        workspace=workspace,
+        work_root=workspace / "memory" / "transcription" / "work",
+        timeout_seconds=timeout_seconds,
+        env=env,
+        cache_root=workspace / "memory" / "transcription" / "cache",
+        cache_max_bytes=max(0, cache_max_mb) * 1024 * 1024,
+    )
+
+
+def parse_stage_workers(raw: str) -> dict[str, int]:
+    workers = dict(DEFAULT_STAGE_WORKERS)
+    for part in raw.split(","):
+        name, _, value = part.partition("=")
+        if name.strip() not in workers or not value.strip():
+            continue
+        try:
+            workers[name.strip()] = max(1, int(value))
+        except ValueError:
+            continue
+    return workers
+
+
+def video_id_for(source: str) -> str:
+    value = source.strip()
+    if VIDEO_ID_RE.match(value):
+        return value
+    match = VIDEO_URL_ID_RE.search(value)
+    return match.group(1) if match else ""
+
+
+def work_dir_for(row: dict[str, Any], ctx: PipelineContext) -> Path:
+    video_id = video_id_for(str(row.get("source") or ""))
+    return ctx.work_root / (video_id or str(row.get("id") or "unknown"))
+
+
+def stage_done(row: dict[str, Any], stage: str) -> bool:
+    info = (row.get("stages") or {}).get(stage)
+    if not info:
+        return False
+    # A recorded stage only counts while its artifacts are still on disk.
+    return all(Path(p).exists() for p in (info.get("outputs") or {}).values())
+
+
+def next_stage(row: dict[str, Any]) -> str | None:
+    for stage in STAGES:
+        if not stage_done(row, stage):
+            return stage
+    return None
+
+
+def stage_output(row: dict[str, Any], stage: str, key: str) -> str:
+    return str((((row.get("stages") or {}).get(stage) or {}).get("outputs") or {}).get(key) or "")
+
+
+# Artifact cache: memory/transcription/cache/<video_id>/<name>. Names encode what produced
+# the artifact (captions.srt, audio.mp3, whisper-<model>.srt, clean-<sha of srt>.txt), so a
+# hit is always safe to reuse. File mtime doubles as the LRU clock. Work-dir artifacts are
+# hard-linked; published transcripts are copied so later edits never leak into the cache.
+def link_or_copy(src: Path, dst: Path, link: bool = True) -> None:
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        if not link:
+            raise OSError("copy requested")
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+
+def cache_get(ctx: PipelineContext, video_id: str, name: str, dst: Path, link: bool = True) -> bool:
+    if ctx.cache_max_bytes <= 0 or not video_id:
+        return False
+    cached = ctx.cache_root / video_id / name
+    if not cached.exists() or cached.stat().st_size == 0:
+        return False
+    os.utime(cached)
+    link_or_copy(cached, dst, link)
+    return True
+
+
+def cache_put(ctx: PipelineContext, video_id: str, name: str, src: Path, link: bool = True) -> None:
+    if ctx.cache_max_bytes <= 0 or not video_id or not src.exists():
+        return
+    link_or_copy(src, ctx.cache_root / video_id / name, link)
+    evict_cache(ctx.cache_root, ctx.cache_max_bytes)
+
+
+def evict_cache(cache_root: Path, max_bytes: int) -> int:
+    entries = []
+    for path in cache_root.glob("*/*"):
+        if path.is_file() and not path.name.startswith("."):
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+def srt_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+
+
+def run_cmd(cmd: list[str], ctx: PipelineContext, stdout: Any = None) -> subprocess.CompletedProcess:
+    try:
+        return subprocess.run(
+            cmd,
+            stdout=stdout if stdout is not None else subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=False,
+            timeout=ctx.timeout_seconds,
+            env=ctx.env,
+        )
+    except subprocess.TimeoutExpired:
+        return subprocess.CompletedProcess(args=cmd, returncode=124, stdout="", stderr=f"stage_timeout_{ctx.timeout_seconds}s")
+    except FileNotFoundError as exc:
+        return subprocess.CompletedProcess(args=cmd, returncode=127, stdout="", stderr=f"missing_binary:{exc.filename}")
+
+
+def fail(stage: str, proc: subprocess.CompletedProcess | None, message: str) -> StageError:
+    detail = ""
+    if proc is not None:
+        detail = (proc.stderr or "").strip() or (proc.stdout or "").strip() or f"exit_{proc.returncode}"
+    return StageError(f"{stage}: {message}" + (f": {detail[-1200:]}" if detail else ""))
+
+
+def require_binary(stage: str, name: str, purpose: str, ctx: PipelineContext) -> None:
+    # "missing_dependency" is what the queue's classify_error keys on.
+    if not shutil.which(name, path=ctx.env.get("PATH")):
+        raise StageError(f"{stage}: missing_dependency: {name} is required {purpose}")
+
+
+def stage_fetch(row: dict[str, Any], ctx: PipelineContext) -> dict[str, str]:
+    video_id = video_id_for(str(row.get("source") or ""))
+    if not video_id:
+        raise StageError(f"fetch: invalid YouTube input '{row.get('source')}'")
+    work = work_dir_for(row, ctx)
+    work.mkdir(parents=True, exist_ok=True)
+    url = f"https://youtu.be/{video_id}"
+    out_tmpl = str(work / "%(id)s.%(ext)s")
+    captions = work / "captions.srt"
+    audio = work / f"{video_id}.mp3"
+    if cache_get(ctx, video_id, "captions.srt", captions):
+        return {"captions": str(captions)}
+    if cache_get(ctx, video_id, "audio.mp3", audio):
+        return {"audio": str(audio)}
+
+    for mode in ("--write-auto-subs", "--write-subs"):
+        run_cmd(
+            ["yt-dlp", "--quiet", "--skip-download", mode, "--sub-langs", SUB_LANGS, "--convert-subs", "srt", "-o", out_tmpl, url],
+            ctx,
+        )
+        subs = sorted(work.glob(f"{video_id}*.srt"))
+        if subs:
+            subs[0].replace(captions)
+            cache_put(ctx, video_id, "captions.srt", captions)
+            return {"captions": str(captions)}
+        # yt-dlp leaves the original VTT when it cannot convert (e.g. no ffmpeg on its PATH).
+        vtts = sorted(work.glob(f"{video_id}*.vtt"))
+        if vtts:
+            require_binary("fetch", "ffmpeg", "to convert VTT subtitles", ctx)
+            proc = run_cmd(
+                ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", str(vtts[0]), str(captions)], ctx
+            )
+            if proc.returncode != 0 or not captions.exists() or captions.stat().st_size == 0:
+                captions.unlink(missing_ok=True)
+                raise fail("fetch", proc, "VTT to SRT conversion failed")
+            cache_put(ctx, video_id, "captions.srt", captions)
+            return {"captions": str(captions)}
+
+    require_binary("fetch", "ffmpeg", "for audio extraction when no subtitles are found", ctx)
+    proc = run_cmd(
+        ["yt-dlp", "--quiet", "-x", "--audio-format", "mp3", "--audio-quality", "0", "-o", out_tmpl, url],
+        ctx,
+    )
+    if proc.returncode != 0 or not audio.exists():
+        raise fail("fetch", proc, "no captions and audio download failed")
+    cache_put(ctx, video_id, "audio.mp3", audio)
+    return {"audio": str(audio)}
+
+
+def stage_transcribe(row: dict[str, Any], ctx: PipelineContext) -> dict[str, str]:
+    captions = stage_output(row, "fetch", "captions")
+    if captions:
+        return {"srt": captions}
+    audio = Path(stage_output(row, "fetch", "audio"))
+    work = work_dir_for(row, ctx)
+    srt = work / "transcript.srt"
+    video_id = video_id_for(str(row.get("source") or ""))
+    model = ctx.env.get("WHISPER_MODEL", "base")
+    cache_name = f"whisper-{model}.srt"
+    if cache_get(ctx, video_id, cache_name, srt):
+        return {"srt": str(srt)}
+
+    proc = None
+    if shutil.which("whisper", path=ctx.env.get("PATH")):
+        require_binary("transcribe", "ffmpeg", "for Whisper to decode audio", ctx)
+        proc = run_cmd(
+            [
+                "whisper",
+                str(audio),
+                "--model",
+                model,
+                "--language",
+                "en",
+                "--output_format",
+                "srt",
+                "--output_dir",
+                str(work),
+            ],
+            ctx,
+        )
+        whisper_srt = work / f"{audio.stem}.srt"
+        if whisper_srt.exists() and whisper_srt.stat().st_size > 0:
+            whisper_srt.replace(srt)
+            cache_put(ctx, video_id, cache_name, srt)
+            return {"srt": str(srt)}
+
+    if ctx.env.get("TRANSCRIBE_ENABLE_CLOUD_FALLBACK", "0").lower() in {"1", "true", "yes", "on"}:
+        provider = ctx.env.get("TRANSCRIBE_CLOUD_PROVIDER", "auto")
+        if cache_get(ctx, video_id, f"cloud-{provider}.srt", srt):
+            return {"srt": str(srt)}
+        proc = run_cmd([str(ctx.workspace / "tools" / "cloud-transcribe"), str(audio), str(srt)], ctx)
+        if srt.exists() and srt.stat().st_size > 0:
+            cache_put(ctx, video_id, f"cloud-{provider}.srt", srt)
+            return {"srt": str(srt)}
+    raise fail("transcribe", proc, "local whisper + cloud fallback produced no transcript")
+
+
+def stage_clean(row: dict[str, Any], ctx: PipelineContext) -> dict[str, str]:
+    video_id = video_id_for(str(row.get("source") or ""))
+    transcripts = ctx.workspace / "memory" / "transcripts"
+    transcripts.mkdir(parents=True, exist_ok=True)
+    out = transcripts / f"{dt.date.today().isoformat()}-{row.get('slug')}-{video_id}.txt"
+    srt = Path(stage_output(row, "transcribe", "srt"))
+    cache_name = f"clean-{srt_digest(srt)}.txt"
+    if cache_get(ctx, video_id, cache_name, out, link=False):
+        return {"transcript": str(out)}
+    with out.open("w", encoding="utf-8") as f:
+        proc = run_cmd(
+            ["python3", str(ctx.workspace / "tools" / "srt-to-clean-text.py"), str(srt)],
+            ctx,
+            stdout=f,
+        )
+    if proc.returncode != 0 or out.stat().st_size == 0:
+        out.unlink(missing_ok=True)
+        raise fail("clean", proc, "srt-to-clean-text failed")
+    cache_put(ctx, video_id, cache_name, out, link=False)
+    return {"transcript": str(out)}
+
+
+def stage_card(row: dict[str, Any], ctx: PipelineContext) -> dict[str, str]:
+    video_id = video_id_for(str(row.get("source") or ""))
+    slug = str(row.get("slug") or "")
+    source_url = str(row.get("source") or "")
+    if VIDEO_ID_RE.match(source_url):
+        source_url = f"https://youtu.be/{video_id}"
+    proc = run_cmd(
+        [
+            "bash",
+            str(ctx.workspace / "scripts" / "new_source_card.sh"),
+            slug,
+            source_url,
+            str(row.get("title") or f"YouTube Video {video_id}"),
+        ],
+        ctx,
+    )
+    card = ctx.workspace / "memory" / "sources" / f"{dt.date.today().isoformat()}-{slug}.md"
+    if proc.returncode != 0 or not card.exists():
+        raise fail("card", proc, "new_source_card.sh failed")
+    transcript = stage_output(row, "clean", "transcript")
+    with card.open("a", encoding="utf-8") as f:
+        f.write(
+            "\n## 8) Transcript\n"
+            f"- Video ID: {video_id}\n"
+            f"- Transcript file: {transcript}\n"
+            "\n## 9) Analysis TODO\n"
+            "- Fill sections 1-7 from transcript evidence.\n"
+            "- Add at least one concrete action under section 7.\n"
+        )
+    return {"sourceCard": str(card)}
+
+
+STAGE_RUNNERS = {
+    "fetch": stage_fetch,
+    "transcribe": stage_transcribe,
+    "clean": stage_clean,
+    "card": stage_card,
+}
+
+
+def run_stage(stage: str, row: dict[str, Any], ctx: PipelineContext) -> dict[str, str]:
+    return STAGE_RUNNERS[stage](row, ctx)
+
+
+def cleanup_work_dir(row: dict[str, Any], ctx: PipelineContext) -> None:
+    shutil.rmtree(work_dir_for(row, ctx), ignore_errors=True)
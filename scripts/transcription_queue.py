@@ -4,13 +4,29 @@
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
+import contextlib
 import datetime as dt
+import fcntl
+import gzip
+import heapq
 import json
+import math
+import os
+import random
+import re
+import shutil
+import socket
+import sqlite3
+import statistics
 import subprocess
 import sys
+import time
 import uuid
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+
+import transcription_pipeline
 
 
 def now_utc() -> dt.datetime:
@@ -53,7 +69,12 @@ def write_jsonl(path: Path, rows: list[dict[str, Any]]) -> None:
     text = "\n".join(json.dumps(r, ensure_ascii=True) for r in rows)
     if text:
         text += "\n"
-    path.write_text(text, encoding="utf-8")
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
 
 
 def append_jsonl(path: Path, row: dict[str, Any]) -> None:
@@ -70,19 +91,565 @@ def queue_counts(rows: list[dict[str, Any]]) -> dict[str, int]:
     return counts
 
 
-def write_legacy_snapshot(legacy_file: Path, queue_file: Path) -> None:
-    rows = read_jsonl(queue_file)
+# Queue state = snapshot (queue.jsonl) + append-only transition events folded on top.
+# Events only ever set fields, so replaying one twice (e.g. after a crash mid-compaction)
+# converges to the same state.
+TRANSITION_FIELDS: dict[str, tuple[str, ...]] = {
+    "attempt": ("attempts", "updatedAt"),
+    "done": ("status", "completedAt", "lastError", "transcriptPath", "sourceCardPath"),
+    "retry": ("status", "lastError", "errorClass", "nextAttemptAt"),
+    "deadletter": ("status", "lastError", "errorClass", "deadletterAt"),
+    # Put back without spending the attempt (circuit breaker open).
+    "defer": ("status", "attempts", "lastError", "errorClass", "nextAttemptAt", "updatedAt"),
+    "stage": ("stages", "updatedAt"),
+}
+
+
+def apply_event(rows: dict[str, dict[str, Any]], event: dict[str, Any]) -> None:
+    row_id = str(event.get("id") or "")
+    kind = str(event.get("event") or "")
+    fields = event.get("fields") or {}
+    if not row_id:
+        return
+    if kind == "remove":
+        rows.pop(row_id, None)
+        return
+    if kind == "add":
+        rows.setdefault(row_id, {}).update(fields)
+        return
+    if row_id in rows:
+        rows[row_id].update(fields)
+
+
+def load_queue(args: argparse.Namespace) -> tuple[dict[str, dict[str, Any]], int]:
+    if args.backend == "sqlite":
+        conn = open_sqlite_queue(args)
+        return {r[0]: json.loads(r[1]) for r in conn.execute("SELECT id, data FROM queue ORDER BY rowid")}, 0
+    return fold_jsonl_queue(args)
+
+
+def fold_jsonl_queue(args: argparse.Namespace, include_live: bool = True) -> tuple[dict[str, dict[str, Any]], int]:
+    rows: dict[str, dict[str, Any]] = {}
+    for row in read_jsonl(args.queue_file):
+        row_id = str(row.get("id") or "")
+        if row_id:
+            rows[row_id] = row
+    segments = [args.compacting_file, args.events_file] if include_live else [args.compacting_file]
+    event_count = 0
+    for segment in segments:
+        for event in read_jsonl(segment):
+            apply_event(rows, event)
+            event_count += 1
+    return rows, event_count
+
+
+def count_events(args: argparse.Namespace) -> int:
+    if args.backend == "sqlite":
+        return 0
+    # The live log is bounded by --compact-after, so this stays cheap as history grows.
+    total = 0
+    for segment in (args.compacting_file, args.events_file):
+        if segment.exists():
+            total += segment.read_bytes().count(b"\n")
+    return total
+
+
+BLOCKING_STATUSES = ("pending", "retrying", "done")
+
+
+def normalize_source(source: str) -> str:
+    video_id = transcription_pipeline.video_id_for(source)
+    if video_id:
+        return f"yt:{video_id}"
+    return source.strip().rstrip("/")
+
+
+def dedupe_keys(source: str, slug: str) -> list[str]:
+    keys: list[str] = []
+    normalized = normalize_source(source)
+    if normalized:
+        keys.append(f"source:{normalized}")
+    if slug.strip():
+        keys.append(f"slug:{slug.strip()}")
+    return keys
+
+
+def snapshot_stamp(path: Path) -> str:
+    if not path.exists():
+        return "missing"
+    stat = path.stat()
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def rebuild_index(conn: sqlite3.Connection, args: argparse.Namespace, rows: list[dict[str, Any]]) -> None:
+    with conn:
+        conn.execute("DELETE FROM dedupe_keys")
+        for row in rows:
+            index_put(conn, row)
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (name, value) VALUES ('snapshot', ?)",
+            (snapshot_stamp(args.queue_file),),
+        )
+
+
+def connect_index(args: argparse.Namespace) -> sqlite3.Connection:
+    conn = getattr(args, "index_conn", None)
+    if conn is not None:
+        return conn
+    args.index_file.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(args.index_file, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS dedupe_keys (key TEXT PRIMARY KEY, id TEXT NOT NULL, status TEXT NOT NULL)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS dedupe_keys_id ON dedupe_keys (id)")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    args.index_conn = conn
+    return conn
+
+
+def open_index(args: argparse.Namespace) -> sqlite3.Connection:
+    if args.backend == "sqlite":
+        return open_sqlite_queue(args)
+    if getattr(args, "index_conn", None) is not None:
+        return args.index_conn
+    conn = connect_index(args)
+    stamp = conn.execute("SELECT value FROM meta WHERE name = 'snapshot'").fetchone()
+    if stamp is None or stamp[0] != snapshot_stamp(args.queue_file):
+        # Someone else compacted (or the index is new): rebuild from the full fold once.
+        rows, _ = fold_jsonl_queue(args)
+        rebuild_index(conn, args, list(rows.values()))
+    return conn
+
+
+def index_put(conn: sqlite3.Connection, row: dict[str, Any]) -> None:
+    status = str(row.get("status") or "pending")
+    for key in dedupe_keys(str(row.get("source") or ""), str(row.get("slug") or "")):
+        existing = conn.execute("SELECT status FROM dedupe_keys WHERE key = ?", (key,)).fetchone()
+        # Never let a deadletter row shadow a live row that owns the same key.
+        if existing and existing[0] in BLOCKING_STATUSES and status not in BLOCKING_STATUSES:
+            continue
+        conn.execute(
+            "INSERT OR REPLACE INTO dedupe_keys (key, id, status) VALUES (?, ?, ?)",
+            (key, str(row.get("id") or ""), status),
+        )
+
+
+def index_lookup(conn: sqlite3.Connection, keys: list[str]) -> tuple[str, str] | None:
+    if not keys:
+        return None
+    placeholders = ",".join("?" for _ in keys)
+    found = conn.execute(
+        f"SELECT id, status FROM dedupe_keys WHERE key IN ({placeholders}) "
+        f"AND status IN ({','.join('?' for _ in BLOCKING_STATUSES)}) LIMIT 1",
+        (*keys, *BLOCKING_STATUSES),
+    ).fetchone()
+    return (found[0], found[1]) if found else None
+
+
+def update_index(args: argparse.Namespace, kind: str, rows: list[dict[str, Any]]) -> None:
+    conn = open_index(args)
+    with conn:
+        for row in rows:
+            row_id = str(row.get("id") or "")
+            if kind == "add":
+                index_put(conn, row)
+            elif kind == "remove":
+                conn.execute("DELETE FROM dedupe_keys WHERE id = ?", (row_id,))
+            elif "status" in TRANSITION_FIELDS.get(kind, ()):
+                conn.execute("UPDATE dedupe_keys SET status = ? WHERE id = ?", (str(row.get("status") or ""), row_id))
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    created_at TEXT NOT NULL,
+    lease_owner TEXT,
+    lease_expires_at REAL NOT NULL DEFAULT 0,
+    lane TEXT NOT NULL DEFAULT 'manual',
+    priority REAL NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS queue_due ON queue (status, next_attempt_at);
+CREATE TABLE IF NOT EXISTS dedupe_keys (key TEXT PRIMARY KEY, id TEXT NOT NULL, status TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS dedupe_keys_id ON dedupe_keys (id);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+TERMINAL_EVENTS = {"done", "retry", "deadletter", "defer"}
+
+
+@contextlib.contextmanager
+def sqlite_tx(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    # BEGIN IMMEDIATE takes the write lock up front so claim/select/update is atomic
+    # across processes; nested calls join the outer transaction.
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def sqlite_insert_row(conn: sqlite3.Connection, row: dict[str, Any]) -> None:
+    conn.execute(
+        "INSERT OR IGNORE INTO queue (id, status, next_attempt_at, created_at, lane, priority, data) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            str(row.get("id") or ""),
+            str(row.get("status") or "pending"),
+            parse_iso(row.get("nextAttemptAt")).timestamp(),
+            str(row.get("createdAt") or ""),
+            row_lane(row),
+            row_priority(row),
+            json.dumps(row, ensure_ascii=True),
+        ),
+    )
+    index_put(conn, row)
+
+
+def open_sqlite_queue(args: argparse.Namespace) -> sqlite3.Connection:
+    conn = getattr(args, "sqlite_conn", None)
+    if conn is not None:
+        return conn
+    args.sqlite_file.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(args.sqlite_file, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SQLITE_SCHEMA)
+    columns = {r[1] for r in conn.execute("PRAGMA table_info(queue)")}
+    if "lane" not in columns:
+        conn.execute("ALTER TABLE queue ADD COLUMN lane TEXT NOT NULL DEFAULT 'manual'")
+        conn.execute("ALTER TABLE queue ADD COLUMN priority REAL NOT NULL DEFAULT 0")
+    conn.execute("CREATE INDEX IF NOT EXISTS queue_lane_due ON queue (lane, status, priority)")
+    args.sqlite_conn = conn
+    with sqlite_tx(conn):
+        migrated = conn.execute("SELECT value FROM meta WHERE name = 'migratedFrom'").fetchone()
+        if migrated is None:
+            # One-time import of whatever the JSONL backend holds so switching is lossless.
+            rows, _ = fold_jsonl_queue(args)
+            for row in rows.values():
+                sqlite_insert_row(conn, row)
+            conn.execute(
+                "INSERT INTO meta (name, value) VALUES ('migratedFrom', ?)",
+                (str(args.queue_file),),
+            )
+    return conn
+
+
+def sqlite_apply_events(args: argparse.Namespace, kind: str, rows: list[dict[str, Any]]) -> int:
+    """Apply transitions to the SQLite store; returns how many were skipped for a lost lease."""
+    conn = open_sqlite_queue(args)
+    keys = TRANSITION_FIELDS.get(kind, ())
+    skipped = 0
+    with sqlite_tx(conn):
+        for row in rows:
+            row_id = str(row.get("id") or "")
+            if kind == "add":
+                sqlite_insert_row(conn, row)
+                continue
+            if kind == "remove":
+                conn.execute("DELETE FROM queue WHERE id = ?", (row_id,))
+                conn.execute("DELETE FROM dedupe_keys WHERE id = ?", (row_id,))
+                continue
+            current = conn.execute(
+                "SELECT data FROM queue WHERE id = ? AND lease_owner = ?", (row_id, args.worker_id)
+            ).fetchone()
+            if current is None:
+                # Only the current lease holder may move an item. Without our lease, the
+                # lease expired and another worker re-claimed (and maybe finished) it:
+                # its result wins.
+                if conn.execute("SELECT 1 FROM queue WHERE id = ?", (row_id,)).fetchone() is not None:
+                    skipped += 1
+                continue
+            data = json.loads(current[0])
+            data.update({k: row.get(k) for k in keys})
+            release = kind in TERMINAL_EVENTS
+            conn.execute(
+                "UPDATE queue SET status = ?, next_attempt_at = ?, data = ?, "
+                "lease_owner = CASE WHEN ? THEN NULL ELSE lease_owner END, "
+                "lease_expires_at = CASE WHEN ? THEN 0 ELSE lease_expires_at END "
+                "WHERE id = ? AND lease_owner = ?",
+                (
+                    str(data.get("status") or "pending"),
+                    parse_iso(data.get("nextAttemptAt")).timestamp(),
+                    json.dumps(data, ensure_ascii=True),
+                    release,
+                    release,
+                    row_id,
+                    args.worker_id,
+                ),
+            )
+            if "status" in keys:
+                conn.execute("UPDATE dedupe_keys SET status = ? WHERE id = ?", (str(data.get("status") or ""), row_id))
+    return skipped
+
+
+def sqlite_claim_due(args: argparse.Namespace, limit: int) -> list[dict[str, Any]]:
+    conn = open_sqlite_queue(args)
+    now = time.time()
+    claimed: list[dict[str, Any]] = []
+    with sqlite_tx(conn):
+        # Top `limit` due rows per lane is always enough input for the fair scheduler.
+        due = conn.execute(
+            "SELECT data FROM ("
+            "  SELECT data, ROW_NUMBER() OVER ("
+            "    PARTITION BY lane ORDER BY priority DESC, next_attempt_at, created_at"
+            "  ) AS lane_rank FROM queue"
+            "  WHERE status IN ('pending', 'retrying') AND next_attempt_at <= ? AND lease_expires_at < ?"
+            ") WHERE lane_rank <= ?",
+            (now, now, limit),
+        ).fetchall()
+        for row in schedule_fair([json.loads(r[0]) for r in due], args.lane_weights, limit):
+            row_id = str(row.get("id") or "")
+            row["attempts"] = int(row.get("attempts") or 0) + 1
+            row["updatedAt"] = now_iso()
+            conn.execute(
+                "UPDATE queue SET data = ?, lease_owner = ?, lease_expires_at = ? WHERE id = ?",
+                (json.dumps(row, ensure_ascii=True), args.worker_id, now + args.lease_seconds, row_id),
+            )
+            claimed.append(row)
+    return claimed
+
+
+def renew_leases(args: argparse.Namespace, rows: list[dict[str, Any]]) -> None:
+    if args.backend != "sqlite" or not rows:
+        return
+    conn = open_sqlite_queue(args)
+    ids = [str(r.get("id") or "") for r in rows]
+    placeholders = ",".join("?" for _ in ids)
+    with sqlite_tx(conn):
+        conn.execute(
+            f"UPDATE queue SET lease_expires_at = ? WHERE lease_owner = ? AND id IN ({placeholders})",
+            (time.time() + args.lease_seconds, args.worker_id, *ids),
+        )
+
+
+def claim_due(args: argparse.Namespace, limit: int) -> tuple[list[dict[str, Any]], dict[str, dict[str, Any]] | None]:
+    """Pick due items and record the attempt; also returns the JSONL fold for reuse (None on SQLite)."""
+    if args.backend == "sqlite":
+        return sqlite_claim_due(args, limit), None
+    queue, _ = load_queue(args)
+    now = now_utc()
+    selected = schedule_fair([r for r in queue.values() if should_process(r, now)], args.lane_weights, limit)
+    for row in selected:
+        row["attempts"] = int(row.get("attempts") or 0) + 1
+        row["updatedAt"] = now_iso()
+    append_events(args, "attempt", selected)
+    return selected, queue
+
+
+def append_events(args: argparse.Namespace, kind: str, rows: list[dict[str, Any]]) -> int:
+    if not rows:
+        return 0
+    if args.backend == "sqlite":
+        return sqlite_apply_events(args, kind, rows)
+    keys = TRANSITION_FIELDS.get(kind)
+    ts = now_iso()
+    lines = []
+    for row in rows:
+        fields = dict(row) if keys is None else {k: row.get(k) for k in keys}
+        lines.append(json.dumps({"ts": ts, "event": kind, "id": row.get("id"), "fields": fields}, ensure_ascii=True))
+    args.events_file.parent.mkdir(parents=True, exist_ok=True)
+    with args.events_file.open("a", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    if kind != "attempt":
+        update_index(args, kind, rows)
+    return 0
+
+
+def append_event(args: argparse.Namespace, kind: str, row: dict[str, Any]) -> int:
+    return append_events(args, kind, [row])
+
+
+def compact_queue(args: argparse.Namespace) -> int:
+    if args.backend == "sqlite":
+        open_sqlite_queue(args).execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return 0
+    # Move the live log aside first so concurrent appenders start a fresh segment,
+    # then fold snapshot + that segment and swap the snapshot in atomically.
+    if args.events_file.exists() and not args.compacting_file.exists():
+        os.replace(args.events_file, args.compacting_file)
+    rows, folded = fold_jsonl_queue(args, include_live=False)
+    write_jsonl(args.queue_file, list(rows.values()))
+    args.compacting_file.unlink(missing_ok=True)
+    full, _ = fold_jsonl_queue(args)
+    rebuild_index(connect_index(args), args, list(full.values()))
+    return folded
+
+
+def maybe_compact(args: argparse.Namespace, event_count: int) -> None:
+    if args.compact_after > 0 and event_count >= args.compact_after:
+        compact_queue(args)
+
+
+def write_legacy_snapshot(
+    legacy_file: Path,
+    queue_file: Path,
+    counts: dict[str, int],
+    total: int,
+    items: list[dict[str, Any]],
+) -> None:
     payload = {
         "generatedAt": now_iso(),
         "queueFile": str(queue_file),
-        "counts": queue_counts(rows),
-        "total": len(rows),
-        "items": rows[-20:],
+        "counts": counts,
+        "total": total,
+        "items": items,
     }
     legacy_file.parent.mkdir(parents=True, exist_ok=True)
     legacy_file.write_text(json.dumps(payload, ensure_ascii=True, indent=2) + "\n", encoding="utf-8")
 
 
+def refresh_legacy_snapshot(
+    args: argparse.Namespace, queue: dict[str, dict[str, Any]] | None = None
+) -> tuple[dict[str, int], int]:
+    if args.backend == "sqlite" and queue is None:
+        conn = open_sqlite_queue(args)
+        counts = {"pending": 0, "retrying": 0, "done": 0, "deadletter": 0}
+        for status, n in conn.execute("SELECT status, COUNT(*) FROM queue GROUP BY status"):
+            counts[status] = n
+        total = sum(counts.values())
+        tail = conn.execute("SELECT data FROM queue ORDER BY rowid DESC LIMIT 20").fetchall()
+        items = [json.loads(r[0]) for r in reversed(tail)]
+    else:
+        if queue is None:
+            queue, _ = load_queue(args)
+        rows = list(queue.values())
+        counts, total, items = queue_counts(rows), len(rows), rows[-20:]
+    write_legacy_snapshot(args.legacy_file, args.store_file, counts, total, items)
+    return counts, total
+
+
+def append_legacy_snapshot(args: argparse.Namespace, rows: list[dict[str, Any]]) -> None:
+    # The legacy snapshot only keeps counts + the last 20 items, so new rows can be
+    # folded in without reading the whole queue.
+    try:
+        payload = json.loads(args.legacy_file.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        refresh_legacy_snapshot(args)
+        return
+    counts = payload.get("counts") or {}
+    for row in rows:
+        status = str(row.get("status") or "pending")
+        counts[status] = int(counts.get(status) or 0) + 1
+    payload["generatedAt"] = now_iso()
+    payload["counts"] = counts
+    payload["total"] = int(payload.get("total") or 0) + len(rows)
+    payload["items"] = (list(payload.get("items") or []) + rows)[-20:]
+    args.legacy_file.write_text(json.dumps(payload, ensure_ascii=True, indent=2) + "\n", encoding="utf-8")
+
+
+# history.jsonl / deadletter.jsonl are append-only logs. Once the live file passes
+# --log-max-mb, or its oldest entry is older than --log-max-days, it is renamed to
+# <name>.<UTC stamp>-<nanoseconds>-<pid>.jsonl and gzipped. The suffix keeps two
+# rotations in the same second apart. Segment names sort chronologically, and every
+# entry in a segment is older than its stamp.
+LOG_TIME_FIELD = {"history": "completedAt", "deadletter": "deadletterAt"}
+SEGMENT_STAMP = "%Y%m%dT%H%M%S"
+
+
+def segment_suffix() -> str:
+    return f"{now_utc().strftime(SEGMENT_STAMP)}-{time.time_ns() % 1_000_000_000:09d}-{os.getpid()}"
+
+
+def log_segments(path: Path) -> list[Path]:
+    return sorted(path.parent.glob(f"{path.stem}.*.jsonl*"))
+
+
+def segment_time(segment: Path) -> dt.datetime:
+    stamp = segment.name[len(segment.name.split(".", 1)[0]) + 1 :].split(".", 1)[0].split("-", 1)[0]
+    try:
+        return dt.datetime.strptime(stamp, SEGMENT_STAMP).replace(tzinfo=dt.timezone.utc)
+    except ValueError:
+        return now_utc()
+
+
+def gz_matches(gz: Path, segment: Path) -> bool:
+    try:
+        with gzip.open(gz, "rb") as f:
+            return f.read() == segment.read_bytes()
+    except (OSError, EOFError):
+        return False
+
+
+def compress_segment(segment: Path) -> Path:
+    """Gzip segment, then delete it. The .jsonl is only removed once a .gz holds its bytes."""
+    gz = segment.with_suffix(".jsonl.gz")
+    if gz.exists() and gz_matches(gz, segment):
+        # An interrupted rotation already compressed it.
+        segment.unlink()
+        return gz
+    if gz.exists():
+        # A different segment owns this name; keep both.
+        gz = segment.with_name(f"{segment.name[: -len('.jsonl')]}-{time.time_ns()}-{os.getpid()}.jsonl.gz")
+    tmp = gz.with_name(f".{gz.name}.{os.getpid()}.tmp")
+    with segment.open("rb") as src, gzip.open(tmp, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(tmp, gz)
+    segment.unlink()
+    return gz
+
+
+def rotate_log(args: argparse.Namespace, path: Path) -> Path | None:
+    if not path.exists() or path.stat().st_size == 0:
+        return None
+    too_big = args.log_max_mb > 0 and path.stat().st_size >= args.log_max_mb * 1024 * 1024
+    too_old = False
+    if args.log_max_days > 0:
+        with path.open("r", encoding="utf-8") as f:
+            first = f.readline()
+        try:
+            oldest = parse_iso(json.loads(first).get(LOG_TIME_FIELD.get(path.stem, "")))
+        except (json.JSONDecodeError, AttributeError):
+            oldest = now_utc()
+        too_old = oldest < now_utc() - dt.timedelta(days=args.log_max_days)
+    if not (too_big or too_old):
+        return None
+    segment = path.with_name(f"{path.stem}.{segment_suffix()}.jsonl")
+    while segment.exists():
+        segment = path.with_name(f"{path.stem}.{segment_suffix()}.jsonl")
+    os.replace(path, segment)
+    # Also finish segments left uncompressed by an interrupted rotation.
+    rotated = segment
+    for pending in log_segments(path):
+        if pending.suffix == ".jsonl":
+            gz = compress_segment(pending)
+            rotated = gz if pending == segment else rotated
+    return rotated
+
+
+def append_log(args: argparse.Namespace, path: Path, row: dict[str, Any]) -> None:
+    rotate_log(args, path)
+    append_jsonl(path, row)
+
+
+def iter_log(path: Path, since: dt.datetime | None = None) -> Iterator[dict[str, Any]]:
+    """Stream rows from rotated segments (oldest first), then the live file."""
+    files = [seg for seg in log_segments(path) if since is None or segment_time(seg) >= since]
+    if path.exists():
+        files.append(path)
+    for file in files:
+        opener = gzip.open if file.suffix == ".gz" else open
+        try:
+            with opener(file, "rt", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            # Rotated away between listing and opening; its gzip twin is listed too.
+            continue
+
+
 def extract_field(stdout: str, prefix: str) -> str:
     for line in stdout.splitlines():
         if line.startswith(prefix):
@@ -90,31 +657,14 @@ def extract_field(stdout: str, prefix: str) -> str:
     return ""
 
 
-def cmd_add(args: argparse.Namespace) -> int:
-    queue = read_jsonl(args.queue_file)
-    for existing in queue:
-        status = str(existing.get("status") or "pending")
-        if status in {"pending", "retrying", "done"} and (
-            str(existing.get("source") or "") == args.source
-            or str(existing.get("slug") or "") == args.slug
-        ):
-            write_legacy_snapshot(args.legacy_file, args.queue_file)
-            print(
-                json.dumps(
-                    {
-                        "ok": True,
-                        "queued": existing.get("id"),
-                        "deduped": True,
-                        "status": status,
-                    }
-                )
-            )
-            return 0
-    row = {
+def new_queue_row(source: str, slug: str, title: str, lane: str = "manual", priority: float = 0.0) -> dict[str, Any]:
+    return {
         "id": f"txq-{uuid.uuid4().hex[:12]}",
-        "source": args.source,
-        "slug": args.slug,
-        "title": args.title or f"YouTube {args.slug}",
+        "source": source,
+        "slug": slug,
+        "title": title or f"YouTube {slug}",
+        "lane": lane,
+        "priority": priority,
         "status": "pending",
         "attempts": 0,
         "createdAt": now_iso(),
@@ -122,13 +672,150 @@ def cmd_add(args: argparse.Namespace) -> int:
         "nextAttemptAt": now_iso(),
         "lastError": "",
     }
-    queue.append(row)
-    write_jsonl(args.queue_file, queue)
-    write_legacy_snapshot(args.legacy_file, args.queue_file)
-    print(json.dumps({"ok": True, "queued": row["id"]}))
+
+
+def add_items(args: argparse.Namespace, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Queue many items in one pass; returns one result per input item, in order.
+
+    Items are deduped against the index and against earlier items in the same batch,
+    then committed as a single event-log write and a single index transaction.
+    """
+    conn = open_index(args)
+    if args.backend == "sqlite":
+        with sqlite_tx(conn):
+            return add_items_locked(args, conn, items)
+    return add_items_locked(args, conn, items)
+
+
+def add_items_locked(args: argparse.Namespace, conn: sqlite3.Connection, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    batch_keys: dict[str, str] = {}
+    new_rows: list[dict[str, Any]] = []
+    results: list[dict[str, Any]] = []
+    for item in items:
+        source = str(item.get("source") or "").strip()
+        slug = str(item.get("slug") or "").strip()
+        if not source or not slug:
+            results.append({"ok": False, "error": "source_and_slug_required", "source": source, "slug": slug})
+            continue
+        keys = dedupe_keys(source, slug)
+        in_batch = next((batch_keys[k] for k in keys if k in batch_keys), None)
+        if in_batch is not None:
+            results.append({"ok": True, "queued": in_batch, "deduped": True, "status": "pending"})
+            continue
+        existing = index_lookup(conn, keys)
+        if existing is not None:
+            results.append({"ok": True, "queued": existing[0], "deduped": True, "status": existing[1]})
+            continue
+        row = new_queue_row(
+            source,
+            slug,
+            str(item.get("title") or ""),
+            lane=str(item.get("lane") or "manual"),
+            priority=row_priority({"priority": item.get("priority", item.get("score"))}),
+        )
+        new_rows.append(row)
+        for key in keys:
+            batch_keys[key] = row["id"]
+        results.append({"ok": True, "queued": row["id"]})
+
+    if new_rows:
+        append_events(args, "add", new_rows)
+        append_legacy_snapshot(args, new_rows)
+        maybe_compact(args, count_events(args))
+    return results
+
+
+def cmd_add(args: argparse.Namespace) -> int:
+    item = {"source": args.source, "slug": args.slug, "title": args.title, "lane": args.lane, "priority": args.priority}
+    result = add_items(args, [item])[0]
+    print(json.dumps(result))
+    return 0 if result.get("ok") else 1
+
+
+def cmd_add_batch(args: argparse.Namespace) -> int:
+    items: list[dict[str, Any]] = []
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError:
+            item = {}
+        items.append(item if isinstance(item, dict) else {})
+    results = add_items(args, items)
+    queued = sum(1 for r in results if r.get("ok") and not r.get("deduped"))
+    deduped = sum(1 for r in results if r.get("deduped"))
+    invalid = sum(1 for r in results if not r.get("ok"))
+    print(
+        json.dumps(
+            {
+                "ok": invalid == 0,
+                "queued": queued,
+                "deduped": deduped,
+                "invalid": invalid,
+                "results": results,
+            }
+        )
+    )
     return 0
 
 
+DEFAULT_LANE_WEIGHTS: dict[str, float] = {"recommendation": 3.0, "manual": 2.0, "harvester": 1.0}
+
+
+def row_lane(row: dict[str, Any]) -> str:
+    return str(row.get("lane") or "manual")
+
+
+def row_priority(row: dict[str, Any]) -> float:
+    try:
+        return float(row.get("priority") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def parse_lane_weights(raw: str) -> dict[str, float]:
+    weights = dict(DEFAULT_LANE_WEIGHTS)
+    for part in raw.split(","):
+        name, _, value = part.partition("=")
+        if not name.strip() or not value.strip():
+            continue
+        try:
+            weights[name.strip()] = max(0.01, float(value))
+        except ValueError:
+            continue
+    return weights
+
+
+def schedule_fair(rows: list[dict[str, Any]], weights: dict[str, float], limit: int) -> list[dict[str, Any]]:
+    """Weighted fair queueing across lanes, highest priority (then oldest due) first within a lane.
+
+    Each lane gets a heap of its rows; lanes are served in order of their next virtual
+    finish time (served / weight), so a lane with weight 3 gets ~3 picks per harvester pick
+    without ever starving the lighter lane.
+    """
+    lanes: dict[str, list[tuple[float, float, str, int, dict[str, Any]]]] = {}
+    for n, row in enumerate(rows):
+        lanes.setdefault(row_lane(row), []).append(
+            (-row_priority(row), parse_iso(row.get("nextAttemptAt")).timestamp(), str(row.get("createdAt") or ""), n, row)
+        )
+    finish: list[tuple[float, str]] = []
+    for lane, heap in lanes.items():
+        heapq.heapify(heap)
+        finish.append((1.0 / weights.get(lane, 1.0), lane))
+    heapq.heapify(finish)
+
+    picked: list[dict[str, Any]] = []
+    while finish and len(picked) < limit:
+        tag, lane = heapq.heappop(finish)
+        heap = lanes[lane]
+        picked.append(heapq.heappop(heap)[-1])
+        if heap:
+            heapq.heappush(finish, (tag + 1.0 / weights.get(lane, 1.0), lane))
+    return picked
+
+
 def should_process(row: dict[str, Any], now: dt.datetime) -> bool:
     status = str(row.get("status") or "")
     if status not in {"pending", "retrying"}:
@@ -137,71 +824,394 @@ def should_process(row: dict[str, Any], now: dt.datetime) -> bool:
     return due <= now
 
 
+def ingest_command(row: dict[str, Any], ingest_script: Path) -> list[str]:
+    return [
+        "bash",
+        str(ingest_script),
+        str(row.get("source") or ""),
+        str(row.get("slug") or ""),
+        str(row.get("title") or ""),
+    ]
+
+
+def run_ingest(cmd: list[str], timeout_seconds: int) -> tuple[subprocess.CompletedProcess, float]:
+    started = time.monotonic()
+    try:
+        proc = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=timeout_seconds,
+        )
+    except subprocess.TimeoutExpired:
+        proc = subprocess.CompletedProcess(
+            args=cmd,
+            returncode=124,
+            stdout="",
+            stderr=f"ingest_timeout_{timeout_seconds}s",
+        )
+    return proc, time.monotonic() - started
+
+
+def run_script_ingest(row: dict[str, Any], args: argparse.Namespace) -> dict[str, str]:
+    proc, _ = run_ingest(ingest_command(row, args.ingest_script), args.ingest_timeout_seconds)
+    if proc.returncode != 0:
+        raise transcription_pipeline.StageError(proc.stderr.strip() or proc.stdout.strip() or f"exit_{proc.returncode}")
+    return {
+        "transcript": extract_field(proc.stdout, "Transcript:"),
+        "sourceCard": extract_field(proc.stdout, "Source card:"),
+    }
+
+
+def timed_stage(args: argparse.Namespace, stage: str, row: dict[str, Any]) -> tuple[str, dict[str, str], float]:
+    """Worker-thread entry point: run one stage, return (error, outputs, seconds)."""
+    started = time.monotonic()
+    try:
+        if stage == "ingest":
+            outputs = run_script_ingest(row, args)
+        else:
+            outputs = transcription_pipeline.run_stage(stage, row, args.pipeline_ctx)
+        return "", outputs, time.monotonic() - started
+    except transcription_pipeline.StageError as exc:
+        return str(exc) or f"{stage}_failed", {}, time.monotonic() - started
+
+
+def record_success(row: dict[str, Any], args: argparse.Namespace, transcript: str, source_card: str) -> str:
+    row["status"] = "done"
+    row["completedAt"] = now_iso()
+    row["lastError"] = ""
+    row["transcriptPath"] = transcript
+    row["sourceCardPath"] = source_card
+    append_log(args, args.history_file, row)
+    return "done"
+
+
+# Ordered: the first matching class wins, so "audio download failed: HTTP Error 429" is a
+# rate limit rather than a missing-captions failure.
+ERROR_CLASSES: tuple[tuple[str, re.Pattern[str]], ...] = (
+    ("missing_dependency", re.compile(r"missing_dependency|missing_binary|ffmpeg is (?:required|missing)", re.I)),
+    ("rate_limit", re.compile(r"\b429\b|too many requests|rate.?limit|sign in to confirm|quota", re.I)),
+    ("timeout", re.compile(r"timeout|timed out", re.I)),
+    (
+        "network",
+        re.compile(
+            r"connection (?:reset|refused|aborted)|name resolution|network is unreachable|urlopen error"
+            r"|unable to download (?:webpage|api page)|remote end closed|ssl|http error 5\d\d",
+            re.I,
+        ),
+    ),
+    ("no_captions", re.compile(r"no subtitles|no captions|no transcript|failed to transcribe", re.I)),
+)
+# Failure classes that mean "the upstream is unhealthy", not "this item is bad":
+# (failures within BREAKER_WINDOW_SECONDS before tripping, base cooldown seconds; doubles
+# per repeated trip). Successes don't clear the count, so failures interleaved with
+# successes still trip the breaker.
+BREAKER_POLICY: dict[str, tuple[int, int]] = {
+    "rate_limit": (2, 900),
+    "network": (3, 300),
+    "timeout": (4, 600),
+    # A missing tool fails every item the same way; pause instead of burning attempts.
+    "missing_dependency": (1, 3600),
+}
+BREAKER_WINDOW_SECONDS = 1800
+BACKOFF_FACTOR: dict[str, float] = {"rate_limit": 4.0, "no_captions": 6.0}
+
+
+def classify_error(error: str) -> str:
+    for name, pattern in ERROR_CLASSES:
+        if pattern.search(error):
+            return name
+    return "other"
+
+
+def backoff_seconds(args: argparse.Namespace, attempts: int, error_class: str) -> float:
+    # Equal jitter: half the exponential step is fixed, half random, so items that failed
+    # together do not all come due in the same tick.
+    ceiling = min(
+        args.base_delay_seconds * BACKOFF_FACTOR.get(error_class, 1.0) * (2 ** max(0, attempts - 1)),
+        args.max_delay_seconds,
+    )
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def load_breaker(args: argparse.Namespace) -> dict[str, dict[str, Any]]:
+    try:
+        state = json.loads(args.breaker_file.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def save_breaker(args: argparse.Namespace, state: dict[str, dict[str, Any]]) -> None:
+    args.breaker_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = args.breaker_file.with_name(f".{args.breaker_file.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=True, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, args.breaker_file)
+
+
+@contextlib.contextmanager
+def breaker_locked(args: argparse.Namespace) -> Iterator[None]:
+    # Overlapping process runs (SQLite backend) read-modify-write breaker.json;
+    # without the lock the last os.replace would drop the other run's failures.
+    lock_path = args.breaker_file.with_name(args.breaker_file.name + ".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with lock_path.open("a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def breaker_open(state: dict[str, dict[str, Any]], now: dt.datetime) -> tuple[str, dt.datetime] | None:
+    tripped = [(parse_iso(v.get("openUntil")), k) for k, v in state.items() if parse_iso(v.get("openUntil")) > now]
+    if not tripped:
+        return None
+    until, name = max(tripped)
+    return name, until
+
+
+def breaker_record_failure(args: argparse.Namespace, error_class: str) -> dt.datetime | None:
+    """Count a failure against its class; returns the resume time if this trips the breaker."""
+    policy = BREAKER_POLICY.get(error_class)
+    if policy is None:
+        return None
+    threshold, cooldown = policy
+    with breaker_locked(args):
+        # Re-read under the lock so overlapping process runs add to the same counters.
+        state = load_breaker(args)
+        entry = state.setdefault(error_class, {"recentFailures": [], "trips": 0})
+        now = time.time()
+        entry["recentFailures"] = [t for t in entry.get("recentFailures") or [] if t > now - BREAKER_WINDOW_SECONDS]
+        entry["recentFailures"].append(round(now, 3))
+        entry["lastFailureAt"] = now_iso()
+        resume_at = None
+        if len(entry["recentFailures"]) >= threshold:
+            entry["trips"] = int(entry.get("trips") or 0) + 1
+            entry["recentFailures"] = []
+            seconds = min(cooldown * 2 ** (entry["trips"] - 1), args.max_delay_seconds)
+            resume_at = now_utc() + dt.timedelta(seconds=seconds)
+            entry["openUntil"] = resume_at.isoformat()
+        save_breaker(args, state)
+    return resume_at
+
+
+def breaker_record_success(args: argparse.Namespace) -> None:
+    """Reset the cooldown escalation of classes that have recovered.
+
+    A class has recovered once its breaker is closed and it has had no failure for a
+    whole window. Classes still failing keep their counts and trips.
+    """
+    with breaker_locked(args):
+        state = load_breaker(args)
+        now = now_utc()
+        changed = False
+        for entry in state.values():
+            recovered = parse_iso(entry.get("lastFailureAt")) <= now - dt.timedelta(seconds=BREAKER_WINDOW_SECONDS)
+            if recovered and int(entry.get("trips") or 0) and parse_iso(entry.get("openUntil")) <= now:
+                entry["trips"] = 0
+                changed = True
+        if changed:
+            save_breaker(args, state)
+
+
+def defer_row(row: dict[str, Any], resume_at: dt.datetime) -> str:
+    # Refund the attempt claim_due charged; spread resumption over a minute.
+    row["attempts"] = max(0, int(row.get("attempts") or 0) - 1)
+    row["status"] = "retrying"
+    row["nextAttemptAt"] = (resume_at + dt.timedelta(seconds=random.uniform(0, 60))).isoformat()
+    row["updatedAt"] = now_iso()
+    return "defer"
+
+
+def record_failure(row: dict[str, Any], args: argparse.Namespace, error: str) -> str:
+    row["lastError"] = error[-1500:]
+    row["errorClass"] = classify_error(error)
+    attempts = int(row.get("attempts") or 0)
+    if attempts >= args.max_attempts:
+        row["status"] = "deadletter"
+        row["deadletterAt"] = now_iso()
+        append_log(args, args.deadletter_file, row)
+        return "deadletter"
+    row["status"] = "retrying"
+    next_due = now_utc() + dt.timedelta(seconds=backoff_seconds(args, attempts, row["errorClass"]))
+    row["nextAttemptAt"] = next_due.isoformat()
+    return "retry"
+
+
+def latency_summary(latencies: list[float]) -> dict[str, float]:
+    if not latencies:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0, "mean": 0.0}
+    ordered = sorted(latencies)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        "p50": round(statistics.median(ordered), 3),
+        "p95": round(ordered[p95_index], 3),
+        "max": round(ordered[-1], 3),
+        "mean": round(statistics.fmean(ordered), 3),
+    }
+
+
 def cmd_process(args: argparse.Namespace) -> int:
-    queue = read_jsonl(args.queue_file)
-    now = now_utc()
-    selected = [r for r in queue if should_process(r, now)]
-    selected.sort(key=lambda r: (parse_iso(r.get("nextAttemptAt")).timestamp(), r.get("createdAt", "")))
-    selected = selected[: args.limit]
+    tripped = breaker_open(load_breaker(args), now_utc())
+    if tripped is not None:
+        # An upstream outage is in progress; leave every item untouched until it cools down.
+        print(
+            json.dumps(
+                {
+                    "ok": True,
+                    "processed": 0,
+                    "paused": True,
+                    "breaker": {"errorClass": tripped[0], "resumeAt": tripped[1].isoformat()},
+                    "queueFile": str(args.store_file),
+                }
+            )
+        )
+        return 0
+    selected, queue = claim_due(args, args.limit)
+
+    workers = max(1, args.workers)
+    if args.pipeline == "staged":
+        args.pipeline_ctx = transcription_pipeline.build_context(
+            args.workspace_dir, args.ingest_timeout_seconds, args.cache_max_mb
+        )
+        pool_sizes = transcription_pipeline.parse_stage_workers(args.stage_workers)
+    else:
+        pool_sizes = {"ingest": workers}
+
+    def first_stage(row: dict[str, Any]) -> str | None:
+        if args.pipeline == "staged":
+            return transcription_pipeline.next_stage(row)
+        return "ingest"
 
     processed = 0
     succeeded = 0
     failed = 0
+    lease_lost = 0
+    deferred = 0
+    paused: tuple[str, dt.datetime] | None = None
+    item_timings: list[dict[str, Any]] = []
+    stage_latencies: dict[str, list[float]] = {name: [] for name in pool_sizes}
+    item_stage_seconds: dict[str, dict[str, float]] = {}
+    item_started: dict[str, float] = {}
+    started = time.monotonic()
+    heartbeat_seconds = max(1.0, args.lease_seconds / 3)
+    last_heartbeat = time.monotonic()
 
-    for row in selected:
+    def finish(row: dict[str, Any], kind: str) -> None:
+        nonlocal processed, succeeded, failed, lease_lost, deferred
+        row_id = str(row.get("id") or "")
         processed += 1
-        row["attempts"] = int(row.get("attempts") or 0) + 1
-        row["updatedAt"] = now_iso()
+        lease_lost += append_event(args, kind, row)
+        ok = kind == "done"
+        if kind == "defer":
+            deferred += 1
+        elif ok:
+            succeeded += 1
+            breaker_record_success(args)
+            if args.pipeline == "staged":
+                transcription_pipeline.cleanup_work_dir(row, args.pipeline_ctx)
+        else:
+            failed += 1
+        item_timings.append(
+            {
+                "id": row_id,
+                "ok": ok,
+                "seconds": round(time.monotonic() - item_started[row_id], 3),
+                "stages": item_stage_seconds.get(row_id, {}),
+            }
+        )
 
-        cmd = [
-            "bash",
-            str(args.ingest_script),
-            str(row.get("source") or ""),
-            str(row.get("slug") or ""),
-            str(row.get("title") or ""),
-        ]
-        try:
-            proc = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=False,
-                timeout=args.ingest_timeout_seconds,
-            )
-        except subprocess.TimeoutExpired:
-            proc = subprocess.CompletedProcess(
-                args=cmd,
-                returncode=124,
-                stdout="",
-                stderr=f"ingest_timeout_{args.ingest_timeout_seconds}s",
+    def stamp_duration(row: dict[str, Any]) -> dict[str, Any]:
+        row["durationSeconds"] = round(time.monotonic() - item_started[str(row.get("id") or "")], 3)
+        return row
+
+    def finish_staged(row: dict[str, Any]) -> None:
+        stamp_duration(row)
+        transcript = transcription_pipeline.stage_output(row, "clean", "transcript")
+        source_card = transcription_pipeline.stage_output(row, "card", "sourceCard")
+        finish(row, record_success(row, args, transcript, source_card))
+
+    # Only the main thread touches queue rows and the store; pool threads just run stage
+    # subprocesses. Each stage has its own pool, so downloads for one item overlap with
+    # Whisper on another, and a retried item resumes at its first unfinished stage.
+    pools = {name: concurrent.futures.ThreadPoolExecutor(max_workers=size) for name, size in pool_sizes.items()}
+    in_flight: dict[concurrent.futures.Future, tuple[dict[str, Any], str]] = {}
+    waiting = list(reversed(selected))
+    try:
+        while waiting or in_flight:
+            # Admit items only while total in-flight stays within the combined pool capacity.
+            while waiting and len(in_flight) < sum(pool_sizes.values()):
+                row = waiting.pop()
+                row_id = str(row.get("id") or "")
+                item_started[row_id] = time.monotonic()
+                stage = first_stage(row)
+                if stage is None:
+                    finish_staged(row)
+                    continue
+                in_flight[pools[stage].submit(timed_stage, args, stage, row)] = (row, stage)
+
+            if not in_flight:
+                continue
+            done, _ = concurrent.futures.wait(
+                in_flight,
+                timeout=heartbeat_seconds,
+                return_when=concurrent.futures.FIRST_COMPLETED,
             )
+            for future in done:
+                row, stage = in_flight.pop(future)
+                row_id = str(row.get("id") or "")
+                error, outputs, elapsed = future.result()
+                stage_latencies[stage].append(elapsed)
+                item_stage_seconds.setdefault(row_id, {})[stage] = round(elapsed, 3)
+                if error:
+                    error_class = classify_error(error)
+                    if paused is not None and error_class in BREAKER_POLICY:
+                        # Part of the outage that already tripped the breaker: don't burn the attempt.
+                        row["lastError"] = error[-1500:]
+                        row["errorClass"] = error_class
+                        finish(row, defer_row(row, paused[1]))
+                        continue
+                    finish(row, record_failure(stamp_duration(row), args, error))
+                    resume_at = None if paused is not None else breaker_record_failure(args, error_class)
+                    if resume_at is not None:
+                        paused = (error_class, resume_at)
+                        # Hand back everything not yet started; their attempts are refunded.
+                        for pending in waiting:
+                            defer_row(pending, resume_at)
+                        lease_lost += append_events(args, "defer", waiting)
+                        deferred += len(waiting)
+                        waiting.clear()
+                    continue
+                if stage == "ingest":
+                    finish(row, record_success(stamp_duration(row), args, outputs.get("transcript", ""), outputs.get("sourceCard", "")))
+                    continue
+                stages = dict(row.get("stages") or {})
+                stages[stage] = {"at": now_iso(), "outputs": outputs}
+                row["stages"] = stages
+                row["updatedAt"] = now_iso()
+                append_event(args, "stage", row)
+                following = transcription_pipeline.next_stage(row)
+                if following is None:
+                    finish_staged(row)
+                    continue
+                if paused is not None:
+                    # Stage progress is saved; pick the item up again once the breaker closes.
+                    finish(row, defer_row(row, paused[1]))
+                    continue
+                in_flight[pools[following].submit(timed_stage, args, following, row)] = (row, following)
 
-        if proc.returncode == 0:
-            row["status"] = "done"
-            row["completedAt"] = now_iso()
-            row["lastError"] = ""
-            row["transcriptPath"] = extract_field(proc.stdout, "Transcript:")
-            row["sourceCardPath"] = extract_field(proc.stdout, "Source card:")
-            append_jsonl(args.history_file, row)
-            succeeded += 1
-        else:
-            error = (proc.stderr.strip() or proc.stdout.strip() or f"exit_{proc.returncode}")
-            row["lastError"] = error[-1500:]
-            attempts = int(row.get("attempts") or 0)
-            if attempts >= args.max_attempts:
-                row["status"] = "deadletter"
-                row["deadletterAt"] = now_iso()
-                append_jsonl(args.deadletter_file, row)
-                failed += 1
-            else:
-                row["status"] = "retrying"
-                delay_seconds = min(args.base_delay_seconds * (2 ** (attempts - 1)), args.max_delay_seconds)
-                next_due = now_utc() + dt.timedelta(seconds=delay_seconds)
-                row["nextAttemptAt"] = next_due.isoformat()
-                failed += 1
-
-    write_jsonl(args.queue_file, queue)
-    write_legacy_snapshot(args.legacy_file, args.queue_file)
+            if time.monotonic() - last_heartbeat >= heartbeat_seconds:
+                renew_leases(args, [*(r for r, _ in in_flight.values()), *waiting])
+                last_heartbeat = time.monotonic()
+    finally:
+        for pool in pools.values():
+            pool.shutdown(wait=True)
+
+    elapsed_total = time.monotonic() - started
+    refresh_legacy_snapshot(args, queue)
+    maybe_compact(args, count_events(args))
     print(
         json.dumps(
             {
@@ -209,7 +1219,17 @@ def cmd_process(args: argparse.Namespace) -> int:
                 "processed": processed,
                 "succeeded": succeeded,
                 "failed": failed,
-                "queueFile": str(args.queue_file),
+                "leaseLost": lease_lost,
+                "deferred": deferred,
+                "breaker": {"errorClass": paused[0], "resumeAt": paused[1].isoformat()} if paused else None,
+                "pipeline": args.pipeline,
+                "workers": pool_sizes,
+                "elapsedSeconds": round(elapsed_total, 3),
+                "throughputPerMinute": round(processed * 60.0 / elapsed_total, 3) if elapsed_total > 0 else 0.0,
+                "latencySeconds": latency_summary([t["seconds"] for t in item_timings]),
+                "stageLatencySeconds": {name: latency_summary(v) for name, v in stage_latencies.items()},
+                "items": item_timings,
+                "queueFile": str(args.store_file),
             }
         )
     )
@@ -217,24 +1237,22 @@ def cmd_process(args: argparse.Namespace) -> int:
 
 
 def cmd_list(args: argparse.Namespace) -> int:
-    queue = read_jsonl(args.queue_file)
-    counts = queue_counts(queue)
-    write_legacy_snapshot(args.legacy_file, args.queue_file)
-    print(json.dumps({"ok": True, "counts": counts, "total": len(queue)}))
+    counts, total = refresh_legacy_snapshot(args)
+    print(json.dumps({"ok": True, "counts": counts, "total": total}))
     return 0
 
 
 def cmd_dedupe(args: argparse.Namespace) -> int:
-    queue = read_jsonl(args.queue_file)
+    queue, _ = load_queue(args)
     if not queue:
-        write_legacy_snapshot(args.legacy_file, args.queue_file)
+        refresh_legacy_snapshot(args, {})
         print(json.dumps({"ok": True, "removed": 0, "remaining": 0}))
         return 0
 
     rank = {"done": 4, "pending": 3, "retrying": 2, "deadletter": 1}
     best_by_key: dict[tuple[str, str], dict[str, Any]] = {}
-    for row in queue:
-        key = (str(row.get("source") or ""), str(row.get("slug") or ""))
+    for row in queue.values():
+        key = (normalize_source(str(row.get("source") or "")), str(row.get("slug") or ""))
         status = str(row.get("status") or "pending")
         row_rank = rank.get(status, 0)
         existing = best_by_key.get(key)
@@ -251,12 +1269,143 @@ def cmd_dedupe(args: argparse.Namespace) -> int:
         ).timestamp():
             best_by_key[key] = row
 
-    deduped = list(best_by_key.values())
-    deduped.sort(key=lambda r: parse_iso(r.get("createdAt")).timestamp())
-    removed = len(queue) - len(deduped)
-    write_jsonl(args.queue_file, deduped)
-    write_legacy_snapshot(args.legacy_file, args.queue_file)
-    print(json.dumps({"ok": True, "removed": removed, "remaining": len(deduped)}))
+    keep = {str(row.get("id") or "") for row in best_by_key.values()}
+    removed = 0
+    for row_id in list(queue):
+        if row_id not in keep:
+            append_event(args, "remove", {"id": row_id})
+            queue.pop(row_id)
+            removed += 1
+    # Dedupe runs ahead of every cron process tick, so it doubles as the compaction point.
+    compact_queue(args)
+    rows = sorted(queue.values(), key=lambda r: parse_iso(r.get("createdAt")).timestamp())
+    refresh_legacy_snapshot(args, {str(r.get("id") or ""): r for r in rows})
+    print(json.dumps({"ok": True, "removed": removed, "remaining": len(rows)}))
+    return 0
+
+
+def cmd_compact(args: argparse.Namespace) -> int:
+    folded = compact_queue(args)
+    _, total = refresh_legacy_snapshot(args)
+    print(json.dumps({"ok": True, "eventsFolded": folded, "total": total}))
+    return 0
+
+
+def parse_window(value: str) -> dt.datetime | None:
+    """'7d', '24h', '30m' (relative to now) or an ISO timestamp."""
+    if not value:
+        return None
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([dhm])", value.strip())
+    if match:
+        unit = {"d": "days", "h": "hours", "m": "minutes"}[match.group(2)]
+        return now_utc() - dt.timedelta(**{unit: float(match.group(1))})
+    return parse_iso(value)
+
+
+def iter_window(
+    path: Path, since: dt.datetime | None, until: dt.datetime | None
+) -> Iterator[tuple[dt.datetime, dict[str, Any]]]:
+    field = LOG_TIME_FIELD.get(path.stem, "updatedAt")
+    for row in iter_log(path, since):
+        at = parse_iso(row.get(field))
+        if (since is None or at >= since) and (until is None or at <= until):
+            yield at, row
+
+
+# Durations go into ~5%-wide log buckets so p50/p95 need constant memory however long
+# the window is.
+DURATION_BUCKET_RATIO = 1.05
+
+
+def duration_quantile(buckets: dict[int, int], total: int, q: float) -> float:
+    rank = q * (total - 1)
+    seen = 0
+    for bucket in sorted(buckets):
+        seen += buckets[bucket]
+        if seen > rank:
+            return round(DURATION_BUCKET_RATIO ** (bucket + 1), 3)
+    return 0.0
+
+
+def cmd_stats(args: argparse.Namespace) -> int:
+    since, until = parse_window(args.since), parse_window(args.until)
+    succeeded = 0
+    deadlettered = 0
+    attempts_total = 0
+    first_at: dt.datetime | None = None
+    last_at: dt.datetime | None = None
+    buckets: dict[int, int] = {}
+    durations = 0
+    duration_sum = 0.0
+    duration_max = 0.0
+    lanes: dict[str, int] = {}
+    error_classes: dict[str, int] = {}
+    for path in (args.history_file, args.deadletter_file):
+        for at, row in iter_window(path, since, until):
+            first_at = at if first_at is None else min(first_at, at)
+            last_at = at if last_at is None else max(last_at, at)
+            attempts_total += int(row.get("attempts") or 0)
+            if path == args.history_file:
+                succeeded += 1
+                lane = row_lane(row)
+                lanes[lane] = lanes.get(lane, 0) + 1
+                seconds = row.get("durationSeconds")
+                if isinstance(seconds, (int, float)) and seconds > 0:
+                    bucket = math.floor(math.log(seconds) / math.log(DURATION_BUCKET_RATIO))
+                    buckets[bucket] = buckets.get(bucket, 0) + 1
+                    durations += 1
+                    duration_sum += seconds
+                    duration_max = max(duration_max, seconds)
+            else:
+                deadlettered += 1
+                error_class = str(row.get("errorClass") or classify_error(str(row.get("lastError") or "")))
+                error_classes[error_class] = error_classes.get(error_class, 0) + 1
+
+    finished = succeeded + deadlettered
+    window_start = since or first_at
+    window_end = until or (now_utc() if since else last_at)
+    hours = (window_end - window_start).total_seconds() / 3600 if window_start and window_end else 0.0
+    print(
+        json.dumps(
+            {
+                "ok": True,
+                "since": window_start.isoformat() if window_start else None,
+                "until": window_end.isoformat() if window_end else None,
+                "succeeded": succeeded,
+                "deadlettered": deadlettered,
+                "successRate": round(succeeded / finished, 4) if finished else None,
+                "meanAttempts": round(attempts_total / finished, 3) if finished else None,
+                "throughputPerHour": round(succeeded / hours, 3) if hours > 0 else None,
+                "durationSeconds": {
+                    "samples": durations,
+                    "p50": min(duration_quantile(buckets, durations, 0.5), round(duration_max, 3)),
+                    "p95": min(duration_quantile(buckets, durations, 0.95), round(duration_max, 3)),
+                    "max": round(duration_max, 3),
+                    "mean": round(duration_sum / durations, 3) if durations else 0.0,
+                },
+                "lanes": lanes,
+                "errorClasses": error_classes,
+            }
+        )
+    )
+    return 0
+
+
+def cmd_query(args: argparse.Namespace) -> int:
+    path = args.history_file if args.log == "history" else args.deadletter_file
+    since, until = parse_window(args.since), parse_window(args.until)
+    emitted = 0
+    for _, row in iter_window(path, since, until):
+        if args.lane and row_lane(row) != args.lane:
+            continue
+        if args.error_class and str(row.get("errorClass") or classify_error(str(row.get("lastError") or ""))) != args.error_class:
+            continue
+        if args.match and args.match.lower() not in f"{row.get('slug')} {row.get('title')} {row.get('source')}".lower():
+            continue
+        sys.stdout.write(json.dumps(row, ensure_ascii=True) + "\n")
+        emitted += 1
+        if args.limit and emitted >= args.limit:
+            break
     return 0
 
 
@@ -267,12 +1416,41 @@ def build_parser() -> argparse.ArgumentParser:
         default=str(Path.home() / ".openclaw" / "workspace"),
         help="Workspace root path",
     )
+    parser.add_argument(
+        "--compact-after",
+        type=int,
+        default=500,
+        help="Fold the event log into queue.jsonl once it holds this many events (0 disables)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("auto", "jsonl", "sqlite"),
+        default=os.environ.get("TRANSCRIPTION_QUEUE_BACKEND", "auto"),
+        help="Queue storage: JSONL event log (single writer) or SQLite with leases (concurrent workers); "
+        "auto uses SQLite once queue.sqlite exists",
+    )
+    parser.add_argument(
+        "--log-max-mb",
+        type=int,
+        default=16,
+        help="Rotate history/deadletter logs (gzip) once the live file reaches this size (0 disables)",
+    )
+    parser.add_argument(
+        "--log-max-days",
+        type=int,
+        default=30,
+        help="Rotate history/deadletter logs once their oldest entry is this old (0 disables)",
+    )
     sub = parser.add_subparsers(dest="cmd", required=True)
 
     add = sub.add_parser("add", help="Queue a new video transcription ingest task")
     add.add_argument("source")
     add.add_argument("slug")
     add.add_argument("title", nargs="?", default="")
+    add.add_argument("--lane", default="manual", help="Scheduling lane: recommendation, harvester or manual")
+    add.add_argument("--priority", type=float, default=0.0, help="Higher runs first within its lane")
+
+    sub.add_parser("add-batch", help="Queue many items from JSONL on stdin ({source, slug, title, lane, priority} per line)")
 
     proc = sub.add_parser("process", help="Process due queue items")
     proc.add_argument("--limit", type=int, default=3)
@@ -280,32 +1458,127 @@ def build_parser() -> argparse.ArgumentParser:
     proc.add_argument("--base-delay-seconds", type=int, default=300)
     proc.add_argument("--max-delay-seconds", type=int, default=86400)
     proc.add_argument("--ingest-timeout-seconds", type=int, default=300)
+    proc.add_argument("--workers", type=int, default=1, help="Max ingests to run in parallel")
+    proc.add_argument(
+        "--lease-seconds",
+        type=int,
+        default=120,
+        help="SQLite backend: claim lease, renewed every third of this while ingests run",
+    )
+    proc.add_argument(
+        "--pipeline",
+        choices=("script", "staged"),
+        default="script",
+        help="script: one ingest_video_source.sh call per item; staged: fetch/transcribe/clean/card pools",
+    )
+    proc.add_argument(
+        "--stage-workers",
+        default="",
+        help="Staged pipeline pool sizes, e.g. fetch=2,transcribe=1,clean=2,card=1",
+    )
+    proc.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=2048,
+        help="Staged pipeline artifact cache budget (LRU-evicted; 0 disables)",
+    )
+    proc.add_argument(
+        "--lane-weights",
+        default="",
+        help="Fair-share weights per lane, e.g. recommendation=3,manual=2,harvester=1",
+    )
 
     sub.add_parser("list", help="List queue counts")
     sub.add_parser("dedupe", help="Remove duplicate queue entries by source/slug")
-    return parser
+    sub.add_parser("compact", help="Fold the event log into the queue snapshot")
 
+    stats = sub.add_parser("stats", help="Throughput, success rate and duration percentiles from history/deadletter logs")
+    stats.add_argument("--since", default="7d", help="Window start: 7d, 24h, 30m or an ISO timestamp ('' for all)")
+    stats.add_argument("--until", default="", help="Window end (default: now)")
 
-def main() -> int:
-    parser = build_parser()
-    args = parser.parse_args()
+    query = sub.add_parser("query", help="Stream matching history/deadletter rows as JSONL")
+    query.add_argument("log", nargs="?", choices=("history", "deadletter"), default="history")
+    query.add_argument("--since", default="", help="Window start: 7d, 24h, 30m or an ISO timestamp")
+    query.add_argument("--until", default="")
+    query.add_argument("--lane", default="")
+    query.add_argument("--error-class", default="", help="rate_limit, timeout, network, missing_dependency, no_captions or other")
+    query.add_argument("--match", default="", help="Case-insensitive substring of slug/title/source")
+    query.add_argument("--limit", type=int, default=0)
+    return parser
 
+
+def resolve_paths(args: argparse.Namespace) -> argparse.Namespace:
+    """Fill in the queue's file paths and derived settings from parsed arguments."""
     workspace = Path(args.workspace).expanduser().resolve()
+    args.workspace_dir = workspace
     tdir = workspace / "memory" / "transcription"
     args.queue_file = tdir / "queue.jsonl"
+    args.events_file = tdir / "queue.events.jsonl"
+    args.compacting_file = tdir / "queue.events.compacting.jsonl"
+    args.index_file = tdir / "queue.index.sqlite"
+    args.sqlite_file = tdir / "queue.sqlite"
+    if args.backend == "auto":
+        # Once a queue has moved to SQLite every writer must follow it there.
+        args.backend = "sqlite" if args.sqlite_file.exists() else "jsonl"
+    args.store_file = args.sqlite_file if args.backend == "sqlite" else args.queue_file
+    args.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    args.lease_seconds = getattr(args, "lease_seconds", 120)
+    args.lane_weights = parse_lane_weights(getattr(args, "lane_weights", "") or "")
     args.history_file = tdir / "history.jsonl"
     args.deadletter_file = tdir / "deadletter.jsonl"
+    args.breaker_file = tdir / "breaker.json"
     args.legacy_file = workspace / "memory" / "transcription_queue.json"
     args.ingest_script = workspace / "scripts" / "ingest_video_source.sh"
+    return args
+
+
+def check_backend(args: argparse.Namespace) -> None:
+    """Raise ValueError when writing to JSONL after the queue moved to SQLite."""
+    if args.backend == "jsonl" and args.sqlite_file.exists():
+        raise ValueError(
+            f"queue was migrated to {args.sqlite_file}; JSONL writes would never be processed "
+            "(use --backend sqlite or auto)"
+        )
+
+
+def queue_args(workspace: Path | str, *options: str) -> argparse.Namespace:
+    """Arguments for calling the queue API (e.g. add_items) in-process.
+
+    options are global CLI flags such as "--backend", "sqlite"; anything not given
+    takes the same default the command line would, so the backend follows the queue.
+    Raises ValueError like the CLI refuses a superseded JSONL backend.
+    """
+    args = resolve_paths(build_parser().parse_args(["--workspace", str(workspace), *options, "add-batch"]))
+    check_backend(args)
+    return args
+
+
+def main() -> int:
+    parser = build_parser()
+    args = resolve_paths(parser.parse_args())
+    if args.cmd not in {"list", "stats", "query"}:
+        try:
+            check_backend(args)
+        except ValueError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 2
 
     if args.cmd == "add":
         return cmd_add(args)
+    if args.cmd == "add-batch":
+        return cmd_add_batch(args)
     if args.cmd == "process":
         return cmd_process(args)
     if args.cmd == "list":
         return cmd_list(args)
     if args.cmd == "dedupe":
         return cmd_dedupe(args)
+    if args.cmd == "compact":
+        return cmd_compact(args)
+    if args.cmd == "stats":
+        return cmd_stats(args)
+    if args.cmd == "query":
+        return cmd_query(args)
     parser.print_help()
     return 1
 
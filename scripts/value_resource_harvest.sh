@@ -3,7 +3,8 @@ set -euo pipefail
 
 WORKSPACE="${OPENCLAW_WORKSPACE:-$HOME/.openclaw/workspace}"
 QUERY_FILE="${WORKSPACE}/config/video_queries.txt"
-QUEUE_SCRIPT="${WORKSPACE}/scripts/transcription_queue.sh"
+QUEUE_SCRIPT="${WORKSPACE}/scripts/transcription_queue.py"
+SEEN_SCRIPT="${WORKSPACE}/scripts/seen_store.py"
 SIGNAL_GATE_SCRIPT="${WORKSPACE}/scripts/research_signal_gate.py"
 POLICY_FILE="${WORKSPACE}/config/research_signal_policy.json"
 TODAY="$(date +%F)"
@@ -16,13 +17,12 @@ VIDEO_RANKED_JSON="${STATE_DIR}/videos-${TODAY}-ranked.json"
 HN_JSON="${STATE_DIR}/hn-${TODAY}.json"
 SIGNAL_GATE_JSON="${STATE_DIR}/signals-${TODAY}.json"
 SIGNAL_HISTORY="${STATE_DIR}/accepted_source_fingerprints.txt"
+RADAR_SIGNALS_GLOB="${WORKSPACE}/radar-system/queue/*-signals-$(date +%Y%m%d)-*.json"
 SEEN_FILE="${STATE_DIR}/seen_videos.txt"
 YT_ERROR_LOG="${STATE_DIR}/videos-${TODAY}-errors.log"
 QUEUE_TOP="${1:-3}"
 
 mkdir -p "$REPORT_DIR" "$STATE_DIR"
-touch "$SEEN_FILE"
-touch "$SIGNAL_HISTORY"
 rm -f "$VIDEO_JSONL" "$VIDEO_RANKED_JSON" "$YT_ERROR_LOG" "$HN_JSON" "$SIGNAL_GATE_JSON"
 
 require() {
@@ -122,16 +122,20 @@ rank_videos() {
 }
 
 queue_top_videos() {
-  local queued=0
-  local line id title url slug
+  local line id title slug result
+  local ids=()
+  local batch=""
+  local -A unseen=()
+  # One seen-store lookup for every accepted video instead of a file scan per ID.
+  while IFS= read -r id; do
+    unseen["$id"]=1
+  done < <(jq -r '.accepted[] | select(.sourceType == "video") | .id // empty' "$SIGNAL_GATE_JSON" \
+    | python3 "$SEEN_SCRIPT" --file "$SEEN_FILE" filter)
   while IFS= read -r line; do
     id="$(jq -r '.id' <<<"$line")"
     title="$(jq -r '.title' <<<"$line")"
-    url="$(jq -r '.url' <<<"$line")"
     [[ -z "${id// }" || "${id}" == "null" ]] && continue
-    if rg -qx "$id" "$SEEN_FILE" >/dev/null 2>&1; then
-      continue
-    fi
+    [[ -n "${unseen[$id]:-}" ]] || continue
     slug="$(printf '%s' "$title" \
       | tr '[:upper:]' '[:lower:]' \
       | tr -cs 'a-z0-9' '-' \
@@ -140,13 +144,30 @@ queue_top_videos() {
     if [[ -z "$slug" ]]; then
       slug="video-${id}"
     fi
-    if bash "$QUEUE_SCRIPT" add "$url" "$slug" "$title" >/dev/null 2>&1; then
-      echo "$id" >>"$SEEN_FILE"
-      queued=$((queued + 1))
-    fi
-    [[ "$queued" -ge "$QUEUE_TOP" ]] && break
+    ids+=("$id")
+    batch+="$(jq -c --arg slug "$slug" '{source: .url, slug: $slug, title: .title, lane: "harvester", priority: ((.scores.relevanceTotal // 0) + (.scores.entrepreneurImportance // 0))}' <<<"$line")"$'\n'
+    [[ "${#ids[@]}" -ge "$QUEUE_TOP" ]] && break
   done < <(jq -c '.accepted[] | select(.sourceType == "video")' "$SIGNAL_GATE_JSON")
-  echo "$queued"
+
+  if [[ "${#ids[@]}" -eq 0 ]]; then
+    echo 0
+    return
+  fi
+
+  # One add-batch call dedupes and commits every pick in a single queue write.
+  result="$(printf '%s' "$batch" | python3 "$QUEUE_SCRIPT" --workspace "$WORKSPACE" add-batch 2>/dev/null || echo '{}')"
+  local queued_ids=()
+  local i=0
+  while IFS= read -r ok; do
+    if [[ "$ok" == "true" && -n "${ids[$i]:-}" ]]; then
+      queued_ids+=("${ids[$i]}")
+    fi
+    i=$((i + 1))
+  done < <(jq -r '.results // [] | .[] | .ok' <<<"$result")
+  if [[ "${#queued_ids[@]}" -gt 0 ]]; then
+    python3 "$SEEN_SCRIPT" --file "$SEEN_FILE" add --reason queued "${queued_ids[@]}"
+  fi
+  echo "${#queued_ids[@]}"
 }
 
 collect_hn() {
@@ -232,6 +253,7 @@ python3 "$SIGNAL_GATE_SCRIPT" \
   --policy "$POLICY_FILE" \
   --videos "$VIDEO_RANKED_JSON" \
   --hn "$HN_JSON" \
+  --sources "$RADAR_SIGNALS_GLOB" \
   --history "$SIGNAL_HISTORY" \
   --output "$SIGNAL_GATE_JSON"
 